@@ -0,0 +1,124 @@
+# benchmarks/conftest.py
+"""
+Benchmark latensi endpoint core/urls.py di atas dataset sintetis.
+
+    pytest benchmarks --bench-size small --bench-output bench-small.json
+    pytest benchmarks --bench-size medium --reuse-db --bench-baseline bench-main.json
+
+Ukuran dataset: small (1k produk / 10k transaksi), medium (100k / 1M), large (1M / 10M);
+bisa ditimpa dengan --bench-products dan --bench-transactions.
+Dengan --reuse-db dataset di test database dipakai ulang antar run.
+"""
+import json
+import threading
+
+import pytest
+from django.core.management import call_command
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+
+BENCH_SIZES = {
+    'small': (1_000, 10_000),
+    'medium': (100_000, 1_000_000),
+    'large': (1_000_000, 10_000_000),
+}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmark')
+    group.addoption('--bench-size', choices=BENCH_SIZES, default='small')
+    group.addoption('--bench-products', type=int, help="Jumlah produk (menimpa --bench-size)")
+    group.addoption('--bench-transactions', type=int, help="Jumlah transaksi (menimpa --bench-size)")
+    group.addoption('--bench-repeat', type=int, default=20, help="Jumlah request terukur per endpoint")
+    group.addoption('--bench-output', default='benchmark-results.json', help="File JSON hasil benchmark")
+    group.addoption('--bench-baseline', help="JSON hasil run sebelumnya; gagal jika ada regresi")
+    group.addoption('--bench-tolerance', type=float, default=1.5,
+                    help="Rasio p95 maksimum terhadap baseline sebelum dianggap regresi")
+    group.addoption('--bench-floor-ms', type=float, default=5.0,
+                    help="Baseline p95 di bawah nilai ini dibulatkan ke atas (noise endpoint sangat cepat)")
+
+
+class QueryCounter:
+    """
+    Hitung query di semua koneksi, termasuk koneksi thread worker
+    (core/concurrency.py) yang tidak tertangkap CaptureQueriesContext.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        with self._lock:
+            self.count += 1
+        return execute(sql, params, many, context)
+
+    def install(self, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+
+def _seed(n_products, n_transactions, days=365, seed=0):
+    # Dataset sama antar run (seed tetap) supaya hasil bisa dibandingkan
+    call_command('generate_inventory', products=n_products, transactions=n_transactions, days=days,
+                 seed=seed, verbosity=0)
+
+
+@pytest.fixture(scope='session')
+def bench_dataset(request, django_db_setup, django_db_blocker):
+    from core.models import Product, StockTransaction
+
+    config = request.config
+    n_products, n_transactions = BENCH_SIZES[config.getoption('--bench-size')]
+    n_products = config.getoption('--bench-products') or n_products
+    n_transactions = config.getoption('--bench-transactions') or n_transactions
+    with django_db_blocker.unblock():
+        if not Product.objects.exists():
+            _seed(n_products, n_transactions)
+        yield {'products': Product.objects.count(), 'transactions': StockTransaction.objects.count()}
+
+
+@pytest.fixture(scope='session')
+def bench_env(bench_dataset):
+    """Setting benchmark: tanpa silk (overhead profiler bukan bagian dari view) dan tanpa manifest static"""
+    from django.conf import settings
+
+    with override_settings(
+        MIDDLEWARE=[m for m in settings.MIDDLEWARE if m != 'core.profiling_silk.SafeSilkyMiddleware'],
+        STORAGES={
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        },
+    ):
+        yield
+
+
+@pytest.fixture(scope='session')
+def query_counter():
+    from django.db import connections
+
+    counter = QueryCounter()
+    for connection in connections.all():
+        counter.install(connection)
+    connection_created.connect(counter.install, weak=False)
+    yield counter
+    connection_created.disconnect(counter.install)
+
+
+@pytest.fixture(scope='session')
+def bench_results(request, bench_dataset):
+    results = {}
+    yield results
+    output = request.config.getoption('--bench-output')
+    with open(output, 'w') as f:
+        json.dump({'dataset': bench_dataset, 'endpoints': results}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+@pytest.fixture(scope='session')
+def bench_baseline(request):
+    path = request.config.getoption('--bench-baseline')
+    if not path:
+        return {}
+    with open(path) as f:
+        return json.load(f)['endpoints']
@@ -0,0 +1,88 @@
+# benchmarks/test_endpoints.py
+import gc
+import math
+import statistics
+import time
+import tracemalloc
+
+import pytest
+from django.urls import reverse
+
+from core.urls import urlpatterns
+
+# Endpoint yang menulis/menghapus data tidak diukur
+SKIPPED = {'api_create_test_product', 'api_update_product_stock', 'api_delete_category', 'api_delete_supplier',
+           'api_delete_product', 'api_delete_all_products', 'api_stock_movements_batch'}
+
+QUERY_STRINGS = {
+    'api_search_products': '?q=Produk 12',
+}
+
+ROUTES = [p.name for p in urlpatterns if p.name not in SKIPPED]
+
+
+def _url(name):
+    from core.models import Category, Product, Supplier
+
+    ids = {
+        'pk': lambda: Product.objects.order_by('id').values_list('id', flat=True).first(),
+        'product_id': lambda: Product.objects.order_by('id').values_list('id', flat=True).first(),
+        'category_id': lambda: Category.objects.order_by('id').values_list('id', flat=True).first(),
+        'supplier_id': lambda: Supplier.objects.order_by('id').values_list('id', flat=True).first(),
+    }
+    pattern = next(p for p in urlpatterns if p.name == name)
+    kwargs = {key: ids[key]() for key in pattern.pattern.converters}
+    return reverse(name, kwargs=kwargs) + QUERY_STRINGS.get(name, '')
+
+
+def _percentile(values, pct):
+    values = sorted(values)
+    return values[max(0, math.ceil(len(values) * pct / 100) - 1)]
+
+
+@pytest.mark.parametrize('name', ROUTES)
+def test_endpoint(name, client, django_db_blocker, bench_env, query_counter, bench_results, bench_baseline, request):
+    repeat = request.config.getoption('--bench-repeat')
+    with django_db_blocker.unblock():
+        url = _url(name)
+
+        # Request pertama (cache dingin) dicatat terpisah
+        start = time.perf_counter()
+        response = client.get(url)
+        first_ms = (time.perf_counter() - start) * 1000
+        assert response.status_code == 200, f'{url} -> {response.status_code}'
+
+        before = query_counter.count
+        client.get(url)
+        queries = query_counter.count - before
+
+        gc.collect()
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            client.get(url)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        tracemalloc.start()
+        client.get(url)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    result = bench_results[name] = {
+        'url': url,
+        'first_ms': round(first_ms, 3),
+        'p50_ms': round(statistics.median(timings), 3),
+        'p95_ms': round(_percentile(timings, 95), 3),
+        'p99_ms': round(_percentile(timings, 99), 3),
+        'queries': queries,
+        'peak_memory_kib': round(peak / 1024, 1),
+    }
+
+    baseline = bench_baseline.get(name)
+    if baseline:
+        tolerance = request.config.getoption('--bench-tolerance')
+        floor = request.config.getoption('--bench-floor-ms')
+        assert result['queries'] <= baseline['queries'], (
+            f"{name}: {result['queries']} queries (baseline {baseline['queries']})")
+        assert result['p95_ms'] <= tolerance * max(baseline['p95_ms'], floor), (
+            f"{name}: p95 {result['p95_ms']} ms (baseline {baseline['p95_ms']} ms)")
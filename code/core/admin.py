@@ -3,9 +3,11 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
 from django import forms
+from django.db import transaction
 from django.db.models import Count
 from django.utils.html import format_html
 from .models import Product, Category, Supplier, StockTransaction
+from .services import record_stock_movement, set_stock_quantity, signed_quantity, update_stock_movement
 
 
 class CustomUserCreationForm(forms.ModelForm):
@@ -194,7 +196,7 @@ class ProductAdmin(admin.ModelAdmin):
         'stock_quantity', 'stock_status', 'purchase_price',
         'selling_price', 'get_profit_margin_display', 'created_at'
     )
-    list_filter = ('category', 'supplier', 'created_at')
+    list_filter = ('is_low_stock', 'category', 'supplier', 'created_at')
     search_fields = ('sku', 'name', 'category__name', 'supplier__name')
     readonly_fields = (
         'created_at', 
@@ -230,9 +232,25 @@ class ProductAdmin(admin.ModelAdmin):
         queryset = queryset.select_related('category', 'supplier')
         return queryset
 
+    def save_model(self, request, obj, form, change):
+        """
+        Edit produk tidak menimpa stock_quantity (nilai form bisa sudah basi); perubahan stok
+        dicatat sebagai transaksi penyesuaian lewat set_stock_quantity (core/services.py).
+        """
+        if not change:
+            super().save_model(request, obj, form, change)
+            return
+        fields = [f.name for f in obj._meta.concrete_fields
+                  if not f.primary_key and not f.generated and f.name != 'stock_quantity']
+        with transaction.atomic():
+            obj.save(update_fields=fields)
+            if 'stock_quantity' in form.changed_data:
+                set_stock_quantity(obj.pk, form.cleaned_data['stock_quantity'], user=request.user,
+                                   notes='Penyesuaian stok via admin')
+
     def stock_status(self, obj):
         """Menampilkan status stok produk"""
-        is_low = obj.stock_quantity <= obj.minimum_stock
+        is_low = obj.is_low_stock
         
         if is_low:
             return format_html(
@@ -285,7 +303,7 @@ class ProductAdmin(admin.ModelAdmin):
     
     def get_is_low_stock(self, obj):
         """Menampilkan status stok rendah dengan detail"""
-        is_low = obj.stock_quantity <= obj.minimum_stock
+        is_low = obj.is_low_stock
         
         if is_low:
             shortage = obj.minimum_stock - obj.stock_quantity
@@ -306,8 +324,36 @@ class ProductAdmin(admin.ModelAdmin):
     get_is_low_stock.short_description = 'Status Stok Rendah'
 
 
+class StockTransactionAdminForm(forms.ModelForm):
+    """Tolak transaksi (baru atau diubah) yang membuat stok negatif, sebelum save_model"""
+
+    class Meta:
+        model = StockTransaction
+        fields = '__all__'
+
+    def clean(self):
+        cleaned_data = super().clean()
+        product = cleaned_data.get('product')
+        quantity = cleaned_data.get('quantity')
+        transaction_type = cleaned_data.get('transaction_type')
+        if not (product and quantity and transaction_type):
+            return cleaned_data
+
+        # Saat edit, self.instance masih berisi nilai lama yang sudah diterapkan ke stok
+        old = self.instance
+        stock = product.stock_quantity + signed_quantity(transaction_type, quantity)
+        if old.pk and old.product_id == product.pk:
+            stock -= signed_quantity(old.transaction_type, old.quantity)
+        elif old.pk and old.product.stock_quantity - signed_quantity(old.transaction_type, old.quantity) < 0:
+            raise forms.ValidationError(f'Stok tidak mencukupi untuk memindahkan transaksi dari {old.product}')
+        if stock < 0:
+            raise forms.ValidationError(f'Stok tidak mencukupi! Stok tersedia: {product.stock_quantity}')
+        return cleaned_data
+
+
 @admin.register(StockTransaction)
 class StockTransactionAdmin(admin.ModelAdmin):
+    form = StockTransactionAdminForm
     list_display = (
         'id', 'product', 'transaction_type_display', 'quantity', 
         'created_by', 'created_at'
@@ -356,24 +402,21 @@ class StockTransactionAdmin(admin.ModelAdmin):
     
     def save_model(self, request, obj, form, change):
         """Auto set created_by dan update stok produk"""
-        if not change:  # Hanya untuk create baru
-            obj.created_by = request.user
-        
-        # Simpan transaksi terlebih dahulu
-        super().save_model(request, obj, form, change)
-        
-        # Update stok produk
-        product = obj.product
-        if obj.transaction_type == 'IN':
-            product.stock_quantity += obj.quantity
-        else:  # OUT
-            product.stock_quantity = max(0, product.stock_quantity - obj.quantity)
-        product.save()
+        if change:
+            # Koreksi stok dengan selisih terhadap nilai transaksi sebelumnya
+            update_stock_movement(obj)
+            return
+
+        # Transaksi + update stok atomik (lihat core/services.py)
+        movement = record_stock_movement(
+            obj.product, obj.transaction_type, obj.quantity, request.user, notes=obj.notes
+        )
+        obj.pk, obj.created_by, obj.created_at = movement.pk, movement.created_by, movement.created_at
     
     def get_form(self, request, obj=None, **kwargs):
         """Set default value untuk created_by di form"""
         form = super().get_form(request, obj, **kwargs)
-        if not obj:  # Hanya untuk form create baru
+        if not obj and 'created_by' in form.base_fields:  # Hanya untuk form create baru
             form.base_fields['created_by'].initial = request.user
         return form
     
@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.conf import settings
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .budgets import install_counter
+        from .metrics import install_timer
+
+        if settings.QUERY_BUDGET_MODE != 'off':
+            connection_created.connect(install_counter)
+        if settings.METRICS_ENABLED:
+            connection_created.connect(install_timer)
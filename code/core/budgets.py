@@ -0,0 +1,89 @@
+# core/budgets.py
+import logging
+import threading
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('query_budget_count', default=None)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCount:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def increment(self):
+        # Query bisa datang dari thread worker core/concurrency.py
+        with self._lock:
+            self.value += 1
+
+
+def count_query(execute, sql, params, many, context):
+    count = _current.get()
+    # EXPLAIN dari profiler (SILKY_ANALYZE_QUERIES) bukan query view
+    if count is not None and not sql.startswith('EXPLAIN'):
+        count.increment()
+    return execute(sql, params, many, context)
+
+
+def install_counter(connection, **kwargs):
+    """Receiver connection_created: pasang penghitung query di setiap koneksi baru"""
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+def query_budget(limit):
+    """
+    Tandai view dengan jumlah query SQL maksimum per request (termasuk query
+    dari thread worker gather_queries). Dicek oleh QueryBudgetMiddleware dan core/tests.py.
+    Pasang sebagai decorator terluar agar ikut menghitung query decorator lain (mis. ETag).
+    """
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+class QueryBudgetMiddleware:
+    """
+    Hitung query setiap request ke view ber-budget. QUERY_BUDGET_MODE:
+    'off', 'log' (warning di logger core.budgets) atau 'raise' (untuk development & test).
+    Letakkan paling akhir di MIDDLEWARE supaya query middleware lain (mis. silk) tidak ikut terhitung.
+    """
+
+    def __init__(self, get_response):
+        if settings.QUERY_BUDGET_MODE == 'off':
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            # Thread worker (gunicorn gthread) dipakai ulang: jangan bawa penghitung ke request berikutnya
+            _current.set(None)
+        budget = getattr(request, '_query_budget', None)
+        if budget is not None and budget[1].value > budget[0]:
+            limit, count = budget
+            message = f'{request.resolver_match.view_name}: {count.value} queries (budget {limit})'
+            if settings.QUERY_BUDGET_MODE == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.warning('Query budget exceeded: %s', message, extra={'request': request})
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Pasang penghitung untuk view ber-budget; view tetap dijalankan oleh handler Django"""
+        limit = getattr(view_func, 'query_budget', None)
+        if limit is not None:
+            # Disimpan di request karena ContextVar bisa berada di context lain saat __call__ (ASGI)
+            request._query_budget = (limit, QueryCount())
+            _current.set(request._query_budget[1])
+        return None
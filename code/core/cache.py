@@ -0,0 +1,78 @@
+# core/cache.py
+import time
+
+from django.core.cache import cache
+from django.db.models import Count, F, Sum
+
+from .models import Category, Product, StockTransaction, Supplier
+
+MODEL_VERSION_KEY = 'inventory:version:{}'
+VALUATION_TIMEOUT = 60 * 60
+# Model yang setiap perubahannya menaikkan versinya sendiri (core/signals.py, dan manual untuk bulk write).
+# Mutasi stok (Product.stock_quantity lewat core/services.py) menaikkan versi StockTransaction,
+# bukan Product, agar daftar yang tidak menampilkan stok tetap bisa dijawab 304.
+VERSIONED_MODELS = (Category, Product, StockTransaction, Supplier)
+
+
+def _version_key(model):
+    return MODEL_VERSION_KEY.format(model._meta.label_lower)
+
+
+def model_versions(*models):
+    """Versi tiap model, dengan satu GET ke cache"""
+    keys = [_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Mulai dari timestamp agar versi lama tidak terpakai ulang setelah key hilang/evicted
+            version = int(time.time() * 1000)
+            cache.add(key, version, timeout=None)
+            versions[key] = cache.get(key, version)
+    return [versions[key] for key in keys]
+
+
+def bump_model_versions(*models):
+    """Invalidasi semua cache/ETag yang bergantung pada `models` dengan menaikkan versinya"""
+    for model in models:
+        key = _version_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, int(time.time() * 1000), timeout=None)
+
+
+def bump_stock_version():
+    """Setelah mutasi stok: ledger dan Product.stock_quantity berubah, data katalog tidak"""
+    bump_model_versions(StockTransaction)
+
+
+def valuation_version():
+    # Valuasi membaca kategori/supplier, produk, dan stok
+    return '.'.join(str(version) for version in model_versions(*VERSIONED_MODELS))
+
+
+def _cached(name, compute):
+    key = f'inventory:valuation:{name}:v{valuation_version()}'
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, VALUATION_TIMEOUT)
+    return value
+
+
+def _grouped_valuation(model):
+    return list(model.objects.values('id', 'name').annotate(
+        product_count=Count('products'),
+        total_stock=Sum('products__stock_quantity'),
+        total_value=Sum(F('products__stock_quantity') * F('products__purchase_price'))
+    ).order_by('-total_value'))
+
+
+def category_valuation():
+    """[{id, name, product_count, total_stock, total_value}] per kategori, urut nilai stok (cached)"""
+    return _cached('category', lambda: _grouped_valuation(Category))
+
+
+def supplier_valuation():
+    """[{id, name, product_count, total_stock, total_value}] per supplier, urut nilai stok (cached)"""
+    return _cached('supplier', lambda: _grouped_valuation(Supplier))
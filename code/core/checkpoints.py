@@ -0,0 +1,98 @@
+# core/checkpoints.py
+"""
+Stok per tanggal ("stock as of") tanpa menjumlah seluruh ledger.
+
+Titik awal adalah anchor terdekat dengan tanggal yang diminta: StockCheckpoint
+sebelum atau sesudahnya, atau stok saat ini. Dari anchor itu hanya perubahan
+(IN - OUT) di antara kedua tanggal yang diterapkan, dibaca dari DailyStockSummary
+yang sudah teragregasi per hari, sehingga biayanya sebanding dengan jarak ke anchor.
+
+Asumsi: setelah produk ada, setiap perubahan Product.stock_quantity tercatat di
+ledger (core/services.py). Hanya dengan asumsi itu semua anchor memberi hasil yang
+sama. Stok awal produk baru tidak tercatat di ledger, jadi produk tanpa baris
+checkpoint dihitung dari anchor stok saat ini. Import dan edit produk di admin mencatat
+selisih stok sebagai transaksi penyesuaian; penulisan stok di luar core/services.py
+melanggar asumsi ini, dan checkpoint sesudahnya harus dibuat ulang.
+"""
+from django.db import transaction
+from django.db.models import Case, DecimalField, ExpressionWrapper, F, IntegerField, OuterRef, Subquery, Sum, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import DailyStockSummary, Product, StockCheckpoint
+
+CHECKPOINT_BATCH_SIZE = 5000
+
+SIGNED_QUANTITY = Case(When(transaction_type='IN', then=F('quantity')), default=-F('quantity'),
+                       output_field=IntegerField())
+
+
+def _delta(summaries):
+    """Subquery per produk: total perubahan stok (IN - OUT) pada rekap harian `summaries`"""
+    per_product = (summaries.filter(product=OuterRef('pk')).order_by()
+                   .values('product').annotate(delta=Sum(SIGNED_QUANTITY)).values('delta'))
+    return Coalesce(Subquery(per_product), 0, output_field=IntegerField())
+
+
+def create_checkpoint(day, batch_size=CHECKPOINT_BATCH_SIZE):
+    """
+    Tulis (atau tulis ulang) StockCheckpoint untuk akhir tanggal lokal `day`:
+    stok saat ini dikurangi perubahan setelah `day`, dibaca dalam satu query
+    sehingga konsisten walau ada transaksi baru selama checkpoint dibuat.
+    Mengembalikan jumlah baris yang ditulis.
+    """
+    rows = (Product.objects.order_by()
+            .annotate(later=_delta(DailyStockSummary.objects.filter(date__gt=day)))
+            .values_list('id', 'stock_quantity', 'later', 'purchase_price'))
+    created = 0
+    with transaction.atomic():
+        StockCheckpoint.objects.filter(date=day).delete()
+        batch = []
+        for product_id, stock_quantity, later, purchase_price in rows.iterator(chunk_size=batch_size):
+            batch.append(StockCheckpoint(date=day, product_id=product_id, stock_quantity=stock_quantity - later,
+                                         purchase_price=purchase_price))
+            if len(batch) >= batch_size:
+                StockCheckpoint.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        StockCheckpoint.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def nearest_checkpoint(day):
+    """Tanggal checkpoint terdekat dengan `day`, atau None jika stok saat ini lebih dekat"""
+    before = StockCheckpoint.objects.filter(date__lte=day).order_by('-date').values_list('date', flat=True).first()
+    after = StockCheckpoint.objects.filter(date__gt=day).order_by('date').values_list('date', flat=True).first()
+    candidates = [(abs((anchor - day).days), anchor) for anchor in (before, after) if anchor is not None]
+    candidates.append(((timezone.localdate() - day).days, None))
+    return min(candidates, key=lambda c: c[0])[1]
+
+
+def stock_as_of(day):
+    """
+    Product queryset dengan anotasi `stock_as_of` dan `stock_value_as_of` (harga beli
+    saat checkpoint) pada akhir tanggal lokal `day`, beserta tanggal checkpoint yang
+    dipakai (None = dihitung mundur dari stok saat ini).
+    """
+    anchor = nearest_checkpoint(day)
+    summaries = DailyStockSummary.objects.all()
+    from_current = F('stock_quantity') - _delta(summaries.filter(date__gt=day))
+    if anchor is None:
+        stock, price = from_current, F('purchase_price')
+    else:
+        checkpoint = StockCheckpoint.objects.filter(date=anchor, product=OuterRef('pk'))
+        if anchor <= day:
+            delta = _delta(summaries.filter(date__gt=anchor, date__lte=day))
+        else:
+            delta = -_delta(summaries.filter(date__gt=day, date__lte=anchor))
+        # Produk yang dibuat setelah checkpoint belum punya baris (NULL + delta = NULL):
+        # hitung mundur dari stok saat ini seperti anchor None, bukan mulai dari 0
+        stock = Coalesce(Subquery(checkpoint.values('stock_quantity')) + delta, from_current,
+                         output_field=IntegerField())
+        price = Coalesce(Subquery(checkpoint.values('purchase_price')), F('purchase_price'))
+
+    products = Product.objects.annotate(stock_as_of=ExpressionWrapper(stock, output_field=IntegerField()))
+    products = products.annotate(stock_value_as_of=ExpressionWrapper(
+        F('stock_as_of') * price, output_field=DecimalField(max_digits=20, decimal_places=2)))
+    return products, anchor
@@ -0,0 +1,41 @@
+# core/concurrency.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+# Pool terbatas: setiap thread memegang koneksi DB sendiri, jadi ukuran pool
+# adalah batas koneksi tambahan per proses.
+_executor = ThreadPoolExecutor(max_workers=settings.STATS_QUERY_WORKERS, thread_name_prefix='stats-query')
+
+
+def _in_atomic_block():
+    return connection.in_atomic_block
+
+
+def _run(query):
+    try:
+        return query()
+    finally:
+        # Tutup koneksi thread worker sesuai CONN_MAX_AGE (dipakai ulang jika persistent)
+        close_old_connections()
+
+
+async def gather_queries(**queries):
+    """
+    Jalankan beberapa query independen secara bersamaan di thread pool terbatas.
+    Setiap nilai adalah callable sync yang mengevaluasi query-nya sendiri
+    (list(...), .aggregate(), .first()), sehingga latensi total mendekati query terlambat.
+    Di dalam transaksi (mis. TestCase) query dijalankan berurutan di koneksi pemanggil,
+    karena thread lain tidak melihat data yang belum di-commit.
+    Mengembalikan dict dengan key yang sama.
+    """
+    if await sync_to_async(_in_atomic_block)():
+        return await sync_to_async(lambda: {name: query() for name, query in queries.items()})()
+    results = await asyncio.gather(*(
+        sync_to_async(_run, thread_sensitive=False, executor=_executor)(query)
+        for query in queries.values()
+    ))
+    return dict(zip(queries, results))
@@ -0,0 +1,64 @@
+# core/conditional.py
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+
+from .cache import VERSIONED_MODELS, model_versions
+
+
+def models_etag(key='', models=VERSIONED_MODELS):
+    """
+    ETag dari versi per model (core/cache.py), yang naik setelah commit setiap perubahan
+    model tersebut, termasuk bulk write dan penghapusan. Hanya satu GET ke cache,
+    tanpa query database.
+    `key` (mis. path + query string) membedakan representasi dari URL yang berbeda.
+    """
+    versions = '.'.join(str(version) for version in model_versions(*models))
+    return hashlib.md5(f'{key}|{versions}'.encode(), usedforsecurity=False).hexdigest()
+
+
+def conditional_on(*models):
+    """
+    Decorator view read-only: jawab 304 Not Modified jika If-None-Match cocok dengan
+    ETag dari versi `models`, tanpa menjalankan query utama maupun serialisasi.
+    `models` adalah tabel yang dibaca view; hanya perubahan pada model itu yang mengganti ETag.
+    View yang menampilkan stok produk harus menyertakan StockTransaction.
+    Last-Modified sengaja tidak dipakai karena tidak bisa mendeteksi baris yang dihapus.
+    """
+    unversioned = [m.__name__ for m in models if m not in VERSIONED_MODELS]
+    if unversioned:
+        raise ImproperlyConfigured(f"conditional_on: {', '.join(unversioned)} tidak memiliki versi cache")
+
+    def _finish(response, etag):
+        if response.status_code in (200, 304):
+            response.headers.setdefault('ETag', etag)
+        return response
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_inner(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view(request, *args, **kwargs)
+                etag = quote_etag(await sync_to_async(models_etag)(request.get_full_path(), models))
+                response = get_conditional_response(request, etag=etag)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return _finish(response, etag)
+            return markcoroutinefunction(async_inner)
+
+        @wraps(view)
+        def inner(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            etag = quote_etag(models_etag(request.get_full_path(), models))
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return _finish(response, etag)
+        return inner
+    return decorator
@@ -0,0 +1,33 @@
+# core/dates.py
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.utils import timezone
+
+
+def local_day_start(day):
+    """Awal tanggal lokal `day` (zona waktu aktif, default TIME_ZONE) sebagai timestamp UTC"""
+    return timezone.make_aware(datetime.combine(day, time.min)).astimezone(dt_timezone.utc)
+
+
+def local_date_bounds(start=None, end=None):
+    """
+    Tanggal lokal start..end (inklusif, boleh None) menjadi batas UTC setengah terbuka
+    [awal start, awal hari setelah end). Satu hari lokal di Asia/Jakarta = 17:00-17:00 UTC.
+    """
+    lower = local_day_start(start) if start else None
+    upper = local_day_start(end + timedelta(days=1)) if end else None
+    return lower, upper
+
+
+def filter_local_dates(queryset, field, start=None, end=None):
+    """
+    Filter kolom timestamp `field` dengan tanggal lokal start..end. Berbeda dengan
+    `field__date__range`, kolom tidak dibungkus cast ::date sehingga index pada
+    `field` tetap bisa dipakai sebagai range scan.
+    """
+    lower, upper = local_date_bounds(start, end)
+    if lower is not None:
+        queryset = queryset.filter(**{f'{field}__gte': lower})
+    if upper is not None:
+        queryset = queryset.filter(**{f'{field}__lt': upper})
+    return queryset
@@ -0,0 +1,238 @@
+# core/importing.py
+import csv
+from decimal import Decimal, InvalidOperation
+from functools import partial
+
+from django.db import DataError, connection, transaction
+
+from .cache import bump_model_versions
+from .models import Category, Supplier, Product
+from .services import MAX_BATCH_SIZE, record_stock_movements
+
+class CSVImportError(ValueError):
+    pass
+
+
+PRODUCT_COLUMNS = [
+    'sku', 'name', 'category', 'supplier',
+    'purchase_price', 'selling_price', 'stock_quantity', 'minimum_stock',
+]
+# stock_quantity sengaja tidak ditimpa: perubahan stok produk yang sudah ada dicatat
+# sebagai transaksi penyesuaian (adjust_imported_stock) agar ledger tetap sama dengan stok
+PRODUCT_UPDATE_FIELDS = [
+    'name', 'category', 'supplier', 'purchase_price', 'selling_price',
+    'minimum_stock', 'updated_at',
+]
+IMPORT_ADJUSTMENT_NOTE = 'Penyesuaian stok via import'
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        yield from csv.DictReader(csvfile)
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def ensure_categories(names):
+    """Buat kategori yang belum ada dalam satu INSERT, kembalikan map name -> id"""
+    names = {n.strip() for n in names if n and n.strip()}
+    existing = dict(Category.objects.filter(name__in=names).values_list('name', 'id'))
+    missing = names - existing.keys()
+    if missing:
+        Category.objects.bulk_create([Category(name=n) for n in missing], ignore_conflicts=True)
+        transaction.on_commit(partial(bump_model_versions, Category))
+        existing.update(Category.objects.filter(name__in=missing).values_list('name', 'id'))
+    return existing
+
+
+def ensure_suppliers(rows):
+    """
+    Buat supplier yang belum ada (berdasarkan nama) dalam satu INSERT.
+    rows: iterable of dict {'name', 'phone', 'address'}. Kembalikan map name -> id.
+    """
+    wanted = {}
+    for row in rows:
+        name = (row.get('name') or '').strip()
+        if name:
+            wanted.setdefault(name, row)
+
+    existing = {}
+    # Nama supplier tidak unik; ambil id terkecil seperti get_or_create yang lama
+    for name, pk in Supplier.objects.filter(name__in=wanted).order_by('-id').values_list('name', 'id'):
+        existing[name] = pk
+    missing = wanted.keys() - existing.keys()
+    if missing:
+        Supplier.objects.bulk_create([
+            Supplier(name=n, phone=wanted[n].get('phone') or '', address=wanted[n].get('address') or '')
+            for n in missing
+        ])
+        transaction.on_commit(partial(bump_model_versions, Supplier))
+        for name, pk in Supplier.objects.filter(name__in=missing).order_by('-id').values_list('name', 'id'):
+            existing[name] = pk
+    return existing
+
+
+def adjust_imported_stock(targets):
+    """
+    targets: {sku: stok dari CSV}. Untuk produk yang sudah ada, selisih dengan stok saat ini
+    (dibaca dengan baris terkunci) dicatat sebagai StockTransaction penyesuaian tanpa user
+    lewat record_stock_movements. Produk baru tidak disentuh: stok awalnya dari INSERT.
+    Panggil di dalam transaksi import. Mengembalikan jumlah produk yang stoknya disesuaikan.
+    """
+    adjusted = 0
+    for skus in _chunks(targets, MAX_BATCH_SIZE):
+        current = (Product.objects.select_for_update().filter(sku__in=skus).order_by('pk')
+                   .values_list('pk', 'sku', 'stock_quantity'))
+        movements = [
+            {'product_id': pk, 'transaction_type': 'IN' if targets[sku] > stock else 'OUT',
+             'quantity': abs(targets[sku] - stock), 'notes': IMPORT_ADJUSTMENT_NOTE}
+            for pk, sku, stock in current if targets[sku] != stock
+        ]
+        if movements:
+            record_stock_movements(movements, None)
+            adjusted += len(movements)
+    return adjusted
+
+
+def _product_from_row(row, line, categories, suppliers):
+    try:
+        return Product(
+            sku=row['sku'].strip(),
+            name=row['name'],
+            category_id=categories[row['category'].strip()],
+            supplier_id=suppliers[row['supplier'].strip()],
+            purchase_price=Decimal(row['purchase_price']),
+            selling_price=Decimal(row['selling_price']),
+            stock_quantity=int(row['stock_quantity']),
+            minimum_stock=int(row['minimum_stock']),
+        )
+    except (KeyError, TypeError, ValueError, InvalidOperation) as e:
+        raise CSVImportError(f"Baris {line} tidak valid: {e!r}")
+
+
+def upsert_products(rows, chunk_size=5000):
+    """
+    Upsert produk per chunk dengan INSERT ... ON CONFLICT (sku) DO UPDATE.
+    Kategori/supplier di-resolve per chunk dengan satu query masing-masing.
+    Seluruh import berjalan dalam satu transaksi: baris tidak valid membatalkan semuanya,
+    sama seperti copy_products. SKU duplikat: baris terakhir yang dipakai.
+    Mengembalikan jumlah baris yang diproses.
+    """
+    total = 0
+    line = 1
+    with transaction.atomic():
+        for chunk in _chunks(rows, chunk_size):
+            categories = ensure_categories(r.get('category') for r in chunk)
+            suppliers = ensure_suppliers({'name': r.get('supplier')} for r in chunk)
+
+            # ON CONFLICT tidak boleh menyentuh baris yang sama dua kali dalam satu
+            # statement, jadi SKU duplikat di dalam chunk diambil yang terakhir.
+            products = {}
+            for row in chunk:
+                line += 1
+                product = _product_from_row(row, line, categories, suppliers)
+                products[product.sku] = product
+
+            adjust_imported_stock({sku: product.stock_quantity for sku, product in products.items()})
+            Product.objects.bulk_create(
+                products.values(),
+                update_conflicts=True,
+                unique_fields=['sku'],
+                update_fields=PRODUCT_UPDATE_FIELDS,
+            )
+            total += len(chunk)
+        # bulk_create tidak memicu signal post_save: invalidasi cache valuasi manual
+        transaction.on_commit(partial(bump_model_versions, Product))
+    return total
+
+
+def copy_products(path):
+    """
+    Jalur cepat PostgreSQL: COPY file CSV ke staging table sementara, lalu
+    resolve kategori/supplier dan upsert produk dengan beberapa statement set-based.
+    Aturannya sama dengan upsert_products: baris tanpa kategori/supplier atau dengan nilai
+    yang tidak bisa dikonversi membatalkan import (CSVImportError), SKU duplikat memakai
+    baris terakhir di file.
+    """
+    with open(path, newline='', encoding='utf-8') as csvfile:
+        header = next(csv.reader(csvfile))
+        if set(header) != set(PRODUCT_COLUMNS):
+            raise CSVImportError(f"Header products CSV harus berisi kolom: {', '.join(PRODUCT_COLUMNS)}")
+        csvfile.seek(0)
+
+        try:
+            return _copy_products(csvfile, header)
+        except DataError as e:
+            raise CSVImportError(f"Products CSV tidak valid: {str(e).strip()}")
+
+
+def _copy_products(csvfile, header):
+    columns = ', '.join(f'"{c}"' for c in header)
+    with transaction.atomic(), connection.cursor() as cursor:
+        # line = nomor baris data sesuai urutan COPY (baris 1 adalah header)
+        cursor.execute(
+            "CREATE TEMP TABLE import_product_staging (line bigint GENERATED ALWAYS AS IDENTITY (START 2), "
+            + ', '.join(f'"{c}" text' for c in header)
+            + ") ON COMMIT DROP"
+        )
+        with connection.wrap_database_errors:
+            cursor.copy_expert(
+                f"COPY import_product_staging ({columns}) FROM STDIN WITH (FORMAT csv, HEADER true)",
+                csvfile,
+            )
+        cursor.execute(
+            "SELECT line FROM import_product_staging "
+            "WHERE coalesce(trim(category), '') = '' OR coalesce(trim(supplier), '') = '' "
+            "ORDER BY line LIMIT 1"
+        )
+        unresolved = cursor.fetchone()
+        if unresolved:
+            raise CSVImportError(f"Baris {unresolved[0]} tidak valid: kategori dan supplier wajib diisi")
+
+        cursor.execute(
+            "INSERT INTO core_category (name, created_at, updated_at) "
+            "SELECT DISTINCT trim(category), now(), now() FROM import_product_staging "
+            "ON CONFLICT (name) DO NOTHING"
+        )
+        cursor.execute(
+            "INSERT INTO core_supplier (name, phone, address, created_at, updated_at) "
+            "SELECT DISTINCT trim(s.supplier), '', '', now(), now() FROM import_product_staging s "
+            "WHERE NOT EXISTS (SELECT 1 FROM core_supplier x WHERE x.name = trim(s.supplier))"
+        )
+        cursor.execute(
+            "INSERT INTO core_product (sku, name, category_id, supplier_id, purchase_price, "
+            "selling_price, stock_quantity, minimum_stock, created_at, updated_at) "
+            "SELECT DISTINCT ON (trim(s.sku)) trim(s.sku), s.name, c.id, sup.id, "
+            "s.purchase_price::numeric, s.selling_price::numeric, "
+            "s.stock_quantity::integer, s.minimum_stock::integer, now(), now() "
+            "FROM import_product_staging s "
+            "JOIN core_category c ON c.name = trim(s.category) "
+            "JOIN (SELECT name, MIN(id) AS id FROM core_supplier GROUP BY name) sup "
+            "ON sup.name = trim(s.supplier) "
+            "ORDER BY trim(s.sku), s.line DESC "
+            "ON CONFLICT (sku) DO UPDATE SET "
+            "name = EXCLUDED.name, category_id = EXCLUDED.category_id, "
+            "supplier_id = EXCLUDED.supplier_id, purchase_price = EXCLUDED.purchase_price, "
+            "selling_price = EXCLUDED.selling_price, "
+            "minimum_stock = EXCLUDED.minimum_stock, updated_at = EXCLUDED.updated_at"
+        )
+        count = cursor.rowcount
+        # Produk lama yang stoknya berbeda dengan CSV: dicatat sebagai penyesuaian, bukan ditimpa
+        cursor.execute(
+            "SELECT sku, stock FROM ("
+            "SELECT DISTINCT ON (trim(sku)) trim(sku) AS sku, stock_quantity::integer AS stock "
+            "FROM import_product_staging ORDER BY trim(sku), line DESC) s "
+            "JOIN core_product p USING (sku) WHERE p.stock_quantity <> s.stock"
+        )
+        adjust_imported_stock(dict(cursor.fetchall()))
+        transaction.on_commit(partial(bump_model_versions, Product))
+        return count
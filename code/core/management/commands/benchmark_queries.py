@@ -0,0 +1,92 @@
+# core/management/commands/benchmark_queries.py
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from core.models import Category, Product, StockTransaction
+
+
+def _query_shapes():
+    """
+    Bentuk query utama dari core/views.py dan core/admin.py, dipakai untuk
+    membandingkan index set sebelum/sesudah migration (mis. `migrate core 0006` vs `0007`).
+    """
+    product_ids = list(Product.objects.values_list('id', flat=True)[:1000])
+    category_ids = list(Category.objects.values_list('id', flat=True))
+    if not product_ids or not category_ids:
+        raise CommandError("Database kosong; jalankan dengan --seed-products/--seed-transactions")
+    now = timezone.now()
+
+    return {
+        'product_history': lambda: (StockTransaction.objects
+                                    .filter(product_id=random.choice(product_ids))
+                                    .order_by('-created_at', '-id')[:20]),
+        'recent_transactions': lambda: StockTransaction.objects.order_by('-created_at')[:10],
+        'date_range_totals': lambda: (StockTransaction.objects
+                                      .filter(created_at__gte=now - timedelta(days=7), created_at__lt=now)
+                                      .aggregate(total_in=Sum('quantity', filter=Q(transaction_type='IN')),
+                                                 total_out=Sum('quantity', filter=Q(transaction_type='OUT')))),
+        'products_by_category': lambda: (Product.objects
+                                         .filter(category_id=random.choice(category_ids))
+                                         .order_by('name', 'id')[:100]),
+        'catalogue_page': lambda: Product.objects.order_by('name', 'id')[:100],
+        'lowest_stock': lambda: Product.objects.order_by('stock_quantity')[:1],
+        'most_expensive': lambda: Product.objects.order_by('-selling_price')[:1],
+    }
+
+
+def _evaluate(result):
+    return list(result) if hasattr(result, 'query') else result
+
+
+class Command(BaseCommand):
+    help = "Ukur latensi bentuk query utama (untuk membandingkan index set)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed-products', type=int, default=0,
+                            help="Tambahkan N produk sintetis sebelum benchmark")
+        parser.add_argument('--seed-transactions', type=int, default=0,
+                            help="Tambahkan M transaksi sintetis sebelum benchmark")
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--explain', action='store_true', help="Tampilkan query plan setiap query")
+        parser.add_argument('--output', help="Simpan hasil sebagai JSON")
+
+    def handle(self, *args, **options):
+        if options['seed_products'] or options['seed_transactions']:
+            self._seed(options['seed_products'], options['seed_transactions'])
+
+        results = {}
+        for name, shape in _query_shapes().items():
+            _evaluate(shape())  # warm-up
+            timings = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                _evaluate(shape())
+                timings.append((time.perf_counter() - start) * 1000)
+            timings.sort()
+            results[name] = {
+                'median_ms': round(statistics.median(timings), 3),
+                'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 3),
+            }
+            self.stdout.write(f"{name:24} median {results[name]['median_ms']:8.3f} ms   p95 {results[name]['p95_ms']:8.3f} ms")
+            if options['explain']:
+                query = shape()
+                if hasattr(query, 'explain'):
+                    self.stdout.write(query.explain())
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({'vendor': connection.vendor, 'results': results}, f, indent=2)
+
+    def _seed(self, n_products, n_transactions):
+        # Ledger dibangkitkan bersama produknya; tanpa --seed-products pakai ~20 transaksi per produk
+        call_command('generate_inventory', products=n_products or max(1, n_transactions // 20),
+                     transactions=n_transactions, stdout=self.stdout)
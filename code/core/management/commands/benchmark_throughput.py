@@ -0,0 +1,75 @@
+# core/management/commands/benchmark_throughput.py
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+def _fetch(url):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except urllib.error.URLError as e:
+        raise CommandError(f"{url}: {e.reason}")
+    return status, (time.perf_counter() - start) * 1000
+
+
+class Command(BaseCommand):
+    help = "Ukur throughput (req/s) server yang sedang berjalan, mis. runserver vs gunicorn"
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+')
+        parser.add_argument('--concurrency', type=int, default=8, help="Jumlah klien bersamaan")
+        parser.add_argument('--duration', type=float, default=20, help="Lama pengukuran per URL (detik)")
+        parser.add_argument('--output', help="Simpan hasil sebagai JSON")
+
+    def handle(self, *args, **options):
+        results = {}
+        for url in options['urls']:
+            _fetch(url)  # warm-up
+            results[url] = self._measure(url, options['concurrency'], options['duration'])
+            r = results[url]
+            self.stdout.write(f"{url}\n  {r['requests_per_second']:8.1f} req/s   median {r['median_ms']:8.2f} ms"
+                              f"   p95 {r['p95_ms']:8.2f} ms   errors {r['errors']}")
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Hasil disimpan ke {options['output']}"))
+
+    def _measure(self, url, concurrency, duration):
+        timings, errors = [], 0
+        lock = threading.Lock()
+        deadline = time.perf_counter() + duration
+
+        def client():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                status, elapsed = _fetch(url)
+                with lock:
+                    timings.append(elapsed)
+                    errors += status >= 400
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in [executor.submit(client) for _ in range(concurrency)]:
+                future.result()
+        elapsed = time.perf_counter() - start
+
+        timings.sort()
+        return {
+            'requests': len(timings),
+            'errors': errors,
+            'requests_per_second': round(len(timings) / elapsed, 1),
+            'median_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[int(len(timings) * 0.95) - 1], 3),
+        }
@@ -0,0 +1,44 @@
+# core/management/commands/create_stock_checkpoint.py
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.checkpoints import CHECKPOINT_BATCH_SIZE, create_checkpoint
+from core.models import StockCheckpoint
+
+
+class Command(BaseCommand):
+    help = "Tulis snapshot StockCheckpoint untuk akhir suatu tanggal (jalankan setiap malam, mis. via cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Tanggal lokal checkpoint (YYYY-MM-DD), default kemarin")
+        parser.add_argument('--keep-days', type=int,
+                            help="Hapus checkpoint yang lebih tua dari N hari, kecuali checkpoint akhir bulan")
+        parser.add_argument('--batch-size', default=CHECKPOINT_BATCH_SIZE, type=int)
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        day = today - timedelta(days=1)
+        if options['date']:
+            try:
+                day = date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError("--date harus berformat YYYY-MM-DD")
+        if day > today:
+            raise CommandError("--date tidak boleh di masa depan")
+
+        start = time.perf_counter()
+        created = create_checkpoint(day, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {created} checkpoint rows for {day} written in {time.perf_counter() - start:.2f}s"
+        ))
+
+        if options['keep_days'] is not None:
+            cutoff = today - timedelta(days=options['keep_days'])
+            # Checkpoint tanggal terakhir setiap bulan disimpan sebagai anchor untuk audit jangka panjang
+            month_ends = [d for d in StockCheckpoint.objects.filter(date__lt=cutoff)
+                          .dates('date', 'day') if (d + timedelta(days=1)).day == 1]
+            deleted, _ = StockCheckpoint.objects.filter(date__lt=cutoff).exclude(date__in=month_ends).delete()
+            self.stdout.write(f"🗑️  {deleted} old checkpoint rows removed")
@@ -0,0 +1,70 @@
+# core/management/commands/generate_inventory.py
+import os
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.cache import VERSIONED_MODELS, bump_model_versions
+from core.importing import ensure_categories, ensure_suppliers
+from core.synthetic import generate
+
+
+class Command(BaseCommand):
+    help = "Bangkitkan produk & ledger transaksi sintetis dalam jumlah besar untuk uji beban"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, required=True)
+        parser.add_argument('--transactions', type=int, default=0,
+                            help="Perkiraan jumlah transaksi (setiap produk minimal satu)")
+        parser.add_argument('--days', type=int, default=365, help="Rentang waktu ledger (hari ke belakang)")
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--suppliers', type=int, default=200)
+        parser.add_argument('--users', type=int, default=5, help="Jumlah user gudang pencatat transaksi")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Jumlah produk per chunk")
+        parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                            help="Jumlah proses generator (1 = tanpa process pool)")
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options['products'] < 1 or options['days'] < 1 or options['chunk_size'] < 1 or options['workers'] < 1:
+            raise CommandError("--products, --days, --chunk-size dan --workers harus positif")
+        # Setiap produk memilih kategori, supplier, dan user pencatat secara acak dari daftar ini
+        if options['categories'] < 1 or options['suppliers'] < 1 or options['users'] < 1:
+            raise CommandError("--categories, --suppliers dan --users minimal 1")
+        if options['transactions'] < 0:
+            raise CommandError("--transactions tidak boleh negatif")
+
+        categories = ensure_categories(f'Kategori Sintetis {i}' for i in range(options['categories']))
+        suppliers = ensure_suppliers({'name': f'Supplier Sintetis {i}', 'phone': f'021-{i:07d}', 'address': 'Jakarta'}
+                                     for i in range(options['suppliers']))
+        users = []
+        for i in range(options['users']):
+            user, created = User.objects.get_or_create(username=f'gudang{i + 1:02d}')
+            if created:
+                user.set_unusable_password()
+                user.save(update_fields=['password'])
+            users.append(user.pk)
+
+        start = time.perf_counter()
+        n_products = n_transactions = 0
+        chunks = generate(options['products'], options['transactions'], days=options['days'],
+                          category_ids=categories.values(), supplier_ids=suppliers.values(), user_ids=users,
+                          chunk_size=options['chunk_size'], workers=options['workers'], seed=options['seed'])
+        for products, transactions in chunks:
+            n_products += products
+            n_transactions += transactions
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  {n_products}/{options['products']} produk, {n_transactions} transaksi")
+        self._report('Products', n_products, start)
+        self._report('Transactions', n_transactions, start)
+
+        # Baris ditulis langsung tanpa signal, jadi cache valuasi diinvalidasi manual
+        bump_model_versions(*VERSIONED_MODELS)
+
+    def _report(self, label, count, start):
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed if elapsed > 0 else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {label} generated: {count} rows in {elapsed:.2f}s ({rate * 60:,.0f} rows/min)"
+        ))
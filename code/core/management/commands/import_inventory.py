@@ -0,0 +1,60 @@
+# core/management/commands/import_inventory.py
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.importing import CSVImportError, copy_products, ensure_categories, ensure_suppliers, read_csv, upsert_products
+
+
+class Command(BaseCommand):
+    help = "Import kategori, supplier, dan produk dari CSV secara bulk (set-based)"
+
+    def add_arguments(self, parser):
+        default_dir = Path(settings.BASE_DIR) / 'csv_data'
+        parser.add_argument('--categories', default=default_dir / 'categories.csv', type=Path)
+        parser.add_argument('--suppliers', default=default_dir / 'suppliers.csv', type=Path)
+        parser.add_argument('--products', default=default_dir / 'products.csv', type=Path)
+        parser.add_argument('--chunk-size', default=5000, type=int,
+                            help="Jumlah baris produk per INSERT (default 5000)")
+        parser.add_argument('--copy', action='store_true',
+                            help="PostgreSQL: COPY products CSV ke staging table (untuk file sangat besar)")
+
+    def handle(self, *args, **options):
+        for key in ('categories', 'suppliers', 'products'):
+            options[key] = Path(options[key])
+
+        if options['categories'].exists():
+            start = time.perf_counter()
+            count = len(ensure_categories(r['name'] for r in read_csv(options['categories'])))
+            self._report('Categories', count, start)
+
+        if options['suppliers'].exists():
+            start = time.perf_counter()
+            count = len(ensure_suppliers(read_csv(options['suppliers'])))
+            self._report('Suppliers', count, start)
+
+        if not options['products'].exists():
+            raise CommandError(f"File tidak ditemukan: {options['products']}")
+
+        if options['copy'] and connection.vendor != 'postgresql':
+            raise CommandError("--copy hanya tersedia untuk PostgreSQL")
+
+        start = time.perf_counter()
+        try:
+            if options['copy']:
+                count = copy_products(options['products'])
+            else:
+                count = upsert_products(read_csv(options['products']), chunk_size=options['chunk_size'])
+        except CSVImportError as e:
+            raise CommandError(str(e))
+        self._report('Products', count, start)
+
+    def _report(self, label, count, start):
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed if elapsed > 0 else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {label} imported: {count} rows in {elapsed:.2f}s ({rate:,.0f} rows/sec)"
+        ))
@@ -0,0 +1,29 @@
+# core/management/commands/rebuild_daily_stock_summary.py
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services import rebuild_daily_summary
+
+
+class Command(BaseCommand):
+    help = "Bangun ulang tabel DailyStockSummary dari ledger StockTransaction"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help="Hanya bangun ulang mulai tanggal ini (YYYY-MM-DD)")
+        parser.add_argument('--batch-size', default=5000, type=int)
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError("--since harus berformat YYYY-MM-DD")
+
+        start = time.perf_counter()
+        created = rebuild_daily_summary(since=since, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {created} daily summary rows rebuilt in {time.perf_counter() - start:.2f}s"
+        ))
@@ -0,0 +1,167 @@
+# core/metrics.py
+"""
+Metrik runtime dalam format teks Prometheus, diekspos di /metrics.
+
+MetricsMiddleware mencatat per route (nama URL dari core/urls.py): jumlah request,
+histogram latensi, jumlah & durasi query DB, dan ukuran response.
+Dengan PROMETHEUS_MULTIPROC_DIR setiap worker gunicorn menulis ke file mmap
+sendiri di direktori itu dan /metrics menggabungkan semuanya; tanpa itu metrik per proses.
+Gauge bisnis (produk, stok menipis, nilai stok) dihitung saat scrape dengan satu query.
+Akses dibatasi ke METRICS_ALLOWED_IPS atau pemegang METRICS_TOKEN (metrics_allowed).
+"""
+import hmac
+import ipaddress
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.models import Count, F, Q, Sum
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+
+UNMATCHED_ROUTE = 'unmatched'
+
+registry = CollectorRegistry()
+
+REQUESTS = Counter(
+    'inventory_http_requests_total', 'Jumlah request per route',
+    ['route', 'method', 'status'], registry=registry,
+)
+LATENCY = Histogram(
+    'inventory_http_request_duration_seconds', 'Latensi request per route',
+    ['route'], registry=registry,
+)
+RESPONSE_SIZE = Histogram(
+    'inventory_http_response_size_bytes', 'Ukuran body response (non-streaming) per route',
+    ['route'], registry=registry,
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304),
+)
+DB_QUERIES = Histogram(
+    'inventory_db_queries_per_request', 'Jumlah query SQL per request',
+    ['route'], registry=registry,
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 50, 100),
+)
+DB_TIME = Histogram(
+    'inventory_db_query_duration_seconds', 'Total durasi query SQL per request',
+    ['route'], registry=registry,
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+_current = ContextVar('metrics_db_timing', default=None)
+
+
+class DbTiming:
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        # Query bisa datang dari thread worker core/concurrency.py
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+
+
+def time_query(execute, sql, params, many, context):
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.add(time.perf_counter() - start)
+
+
+def install_timer(connection, **kwargs):
+    """Receiver connection_created: pasang pengukur durasi query di setiap koneksi baru"""
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def route_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """
+    Catat metrik setiap request; METRICS_ENABLED=False melepas middleware ini.
+    Letakkan di awal MIDDLEWARE agar latensi middleware lain ikut terukur.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timing = DbTiming()
+        token = _current.set(timing)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        elapsed = time.perf_counter() - start
+
+        route = route_name(request)
+        REQUESTS.labels(route, request.method, str(response.status_code)).inc()
+        LATENCY.labels(route).observe(elapsed)
+        DB_QUERIES.labels(route).observe(timing.count)
+        DB_TIME.labels(route).observe(timing.seconds)
+        if not response.streaming:
+            RESPONSE_SIZE.labels(route).observe(len(response.content))
+        return response
+
+
+class InventoryCollector:
+    """Gauge bisnis yang dihitung saat scrape, sehingga selalu konsisten antar worker"""
+
+    def collect(self):
+        from .models import Product
+
+        stats = Product.objects.aggregate(
+            products=Count('id'),
+            low_stock=Count('id', filter=Q(is_low_stock=True)),
+            stock_units=Sum('stock_quantity'),
+            stock_value=Sum(F('stock_quantity') * F('purchase_price')),
+        )
+        yield GaugeMetricFamily('inventory_products', 'Jumlah produk', value=stats['products'])
+        yield GaugeMetricFamily('inventory_low_stock_products', 'Jumlah produk dengan stok menipis', value=stats['low_stock'])
+        yield GaugeMetricFamily('inventory_stock_units', 'Total unit stok', value=stats['stock_units'] or 0)
+        yield GaugeMetricFamily('inventory_stock_value', 'Total nilai stok (harga beli)', value=float(stats['stock_value'] or 0))
+
+
+_business_registry = CollectorRegistry()
+_business_registry.register(InventoryCollector())
+
+
+def metrics_allowed(request):
+    """True jika REMOTE_ADDR ada di METRICS_ALLOWED_IPS (alamat atau CIDR) atau membawa METRICS_TOKEN"""
+    token = settings.METRICS_TOKEN
+    if token:
+        scheme, _, credentials = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() == 'bearer' and hmac.compare_digest(credentials.encode(), token.encode()):
+            return True
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network.strip(), strict=False)
+               for network in settings.METRICS_ALLOWED_IPS if network.strip())
+
+
+def render_metrics():
+    """Teks eksposisi Prometheus (bytes) beserta content type-nya"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        source = CollectorRegistry()
+        MultiProcessCollector(source)
+    else:
+        source = registry
+    return generate_latest(source) + generate_latest(_business_registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,42 @@
+# Generated by Django 5.0 on 2026-10-16 20:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    # Rekap untuk ledger yang sudah ada, agar laporan tidak kosong sampai rebuild manual
+    from core.services import rebuild_daily_summary
+    rebuild_daily_summary(summary_model=apps.get_model('core', 'DailyStockSummary'),
+                          transaction_model=apps.get_model('core', 'StockTransaction'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_remove_category_core_catego_name_6ef604_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyStockSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='tanggal')),
+                ('transaction_type', models.CharField(choices=[('IN', 'Stock In'), ('OUT', 'Stock Out')], max_length=3, verbose_name='tipe transaksi')),
+                ('quantity', models.IntegerField(default=0, verbose_name='jumlah')),
+                ('transaction_count', models.IntegerField(default=0, verbose_name='jumlah transaksi')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_summaries', to='core.product', verbose_name='produk')),
+            ],
+            options={
+                'verbose_name': 'Rekap Stok Harian',
+                'verbose_name_plural': 'Rekap Stok Harian',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailystocksummary',
+            constraint=models.UniqueConstraint(fields=('date', 'product', 'transaction_type'), name='core_dailystocksummary_unique_key'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+import core.models
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently, TrigramExtension
+from django.db import migrations
+
+# Non-atomic karena index GIN dibangun CONCURRENTLY agar tabel produk tetap bisa ditulis.
+
+
+class PostgresTrigramExtension(TrigramExtension):
+    """CreateExtension hanya memeriksa engine saat forwards; backwards juga dilewati di luar PostgreSQL"""
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class AddPostgresIndexConcurrently(AddIndexConcurrently):
+    """AddIndexConcurrently yang dilewati di engine selain PostgreSQL (state tetap dicatat)"""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('core', '0005_dailystocksummary'),
+    ]
+
+    operations = [
+        PostgresTrigramExtension(),
+        AddPostgresIndexConcurrently(
+            model_name='product',
+            index=core.models.PostgresGinIndex(
+                django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('name'), name='gin_trgm_ops'),
+                name='core_product_name_upper_trgm',
+            ),
+        ),
+        AddPostgresIndexConcurrently(
+            model_name='product',
+            index=core.models.PostgresGinIndex(
+                django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('sku'), name='gin_trgm_ops'),
+                name='core_product_sku_upper_trgm',
+            ),
+        ),
+        AddPostgresIndexConcurrently(
+            model_name='product',
+            index=core.models.PostgresGinIndex(
+                fields=['name'], name='core_product_name_trgm', opclasses=['gin_trgm_ops'],
+            ),
+        ),
+    ]
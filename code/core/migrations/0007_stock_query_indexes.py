@@ -0,0 +1,69 @@
+# Generated by Django 5.0 on 2026-10-16 20:53
+
+import core.operations
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Index dibangun CONCURRENTLY agar product/stocktransaction tetap bisa ditulis
+    atomic = False
+
+    dependencies = [
+        ('core', '0006_product_trigram_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Index baru dibuat dulu, baru index tunggal yang tergantikan dihapus
+        core.operations.AddIndexConcurrentlyIfPostgres(
+            model_name='product',
+            index=models.Index(fields=['name', 'id'], name='core_product_name_id_idx'),
+        ),
+        core.operations.AddIndexConcurrentlyIfPostgres(
+            model_name='product',
+            index=models.Index(fields=['category', 'name', 'id'], name='core_product_category_name_idx'),
+        ),
+        core.operations.AddIndexConcurrentlyIfPostgres(
+            model_name='product',
+            index=models.Index(fields=['supplier', 'name', 'id'], name='core_product_supplier_name_idx'),
+        ),
+        core.operations.AddIndexConcurrentlyIfPostgres(
+            model_name='product',
+            index=models.Index(fields=['stock_quantity'], name='core_product_stock_idx'),
+        ),
+        core.operations.AddIndexConcurrentlyIfPostgres(
+            model_name='product',
+            index=models.Index(fields=['selling_price'], name='core_product_selling_idx'),
+        ),
+        core.operations.AddIndexConcurrentlyIfPostgres(
+            model_name='stocktransaction',
+            index=models.Index(fields=['product', '-created_at', '-id'], name='core_stocktx_product_idx'),
+        ),
+        core.operations.AddIndexConcurrentlyIfPostgres(
+            model_name='stocktransaction',
+            index=models.Index(fields=['created_at', 'transaction_type'], include=('quantity',), name='core_stocktx_created_type_idx'),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='category',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.RESTRICT, related_name='products', to='core.category', verbose_name='kategori'),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='name',
+            field=models.CharField(max_length=200, verbose_name='nama produk'),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='supplier',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.RESTRICT, related_name='products', to='core.supplier', verbose_name='supplier'),
+        ),
+        migrations.AlterField(
+            model_name='stocktransaction',
+            name='product',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.RESTRICT, related_name='transactions', to='core.product', verbose_name='produk'),
+        ),
+    ]
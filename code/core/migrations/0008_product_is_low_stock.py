@@ -0,0 +1,22 @@
+# Generated by Django 5.0 on 2026-10-16 20:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_stock_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='is_low_stock',
+            field=models.GeneratedField(db_persist=True, expression=models.ExpressionWrapper(models.Q(('stock_quantity__lte', models.F('minimum_stock'))), output_field=models.BooleanField()), output_field=models.BooleanField(), verbose_name='stok rendah'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_low_stock', True)), fields=['stock_quantity'], name='core_product_low_stock_idx'),
+        ),
+    ]
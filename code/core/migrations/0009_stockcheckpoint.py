@@ -0,0 +1,33 @@
+# Generated by Django 5.0 on 2026-10-16 22:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_product_is_low_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='tanggal')),
+                ('stock_quantity', models.IntegerField(verbose_name='jumlah stok')),
+                ('purchase_price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='harga beli')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='core.product', verbose_name='produk')),
+            ],
+            options={
+                'verbose_name': 'Checkpoint Stok',
+                'verbose_name_plural': 'Checkpoint Stok',
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='stockcheckpoint',
+            constraint=models.UniqueConstraint(fields=('date', 'product'), name='core_stockcheckpoint_unique_key'),
+        ),
+    ]
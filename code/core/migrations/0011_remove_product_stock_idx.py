@@ -0,0 +1,19 @@
+import core.operations
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    # DROP INDEX CONCURRENTLY tidak boleh berjalan di dalam transaksi
+    atomic = False
+
+    dependencies = [
+        ('core', '0010_stocktransaction_created_by_nullable'),
+    ]
+
+    operations = [
+        core.operations.RemoveIndexConcurrentlyIfPostgres(
+            model_name='product',
+            name='core_product_stock_idx',
+        ),
+    ]
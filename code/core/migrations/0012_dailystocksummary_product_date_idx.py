@@ -0,0 +1,26 @@
+import core.operations
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # Index dibangun CONCURRENTLY agar rekap harian tetap bisa ditulis
+    atomic = False
+
+    dependencies = [
+        ('core', '0011_remove_product_stock_idx'),
+    ]
+
+    operations = [
+        # Index baru dibuat dulu, baru index FK tunggal yang tergantikan dihapus
+        core.operations.AddIndexConcurrentlyIfPostgres(
+            model_name='dailystocksummary',
+            index=models.Index(fields=['product', 'date'], name='core_dailysummary_product_idx'),
+        ),
+        migrations.AlterField(
+            model_name='dailystocksummary',
+            name='product',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='daily_summaries', to='core.product', verbose_name='produk'),
+        ),
+    ]
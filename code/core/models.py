@@ -1,9 +1,29 @@
 # core/models.py
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models import ExpressionWrapper, F, Q
+from django.db.models.functions import Upper
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
 from decimal import Decimal
 
+class PostgresGinIndex(GinIndex):
+    """
+    GinIndex yang hanya dibuat di PostgreSQL. Engine lain (DB_ENGINE, mis. SQLite)
+    tidak mengenal GIN/pg_trgm, jadi SQL-nya kosong; index tetap tercatat di state migration.
+    """
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor != 'postgresql':
+            return ''
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
+
+    def remove_sql(self, model, schema_editor, **kwargs):
+        if schema_editor.connection.vendor != 'postgresql':
+            return ''
+        return super().remove_sql(model, schema_editor, **kwargs)
+
+
 class Category(models.Model):
     name = models.CharField("nama kategori", max_length=100, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -36,18 +56,21 @@ class Supplier(models.Model):
 
 class Product(models.Model):
     sku = models.CharField("SKU", max_length=50, unique=True, db_index=True)
-    name = models.CharField("nama produk", max_length=200, db_index=True)
+    # Index tunggal pada name/category/supplier digantikan index komposit di Meta.indexes
+    name = models.CharField("nama produk", max_length=200)
     category = models.ForeignKey(
         Category, 
         verbose_name="kategori",
         on_delete=models.RESTRICT,
-        related_name='products'
+        related_name='products',
+        db_index=False
     )
     supplier = models.ForeignKey(
         Supplier,
         verbose_name="supplier",
         on_delete=models.RESTRICT,
-        related_name='products'
+        related_name='products',
+        db_index=False
     )
     purchase_price = models.DecimalField(
         "harga beli",
@@ -71,6 +94,13 @@ class Product(models.Model):
         default=10,
         validators=[MinValueValidator(0)]
     )
+    # Kolom tersimpan yang dihitung database, supaya "stok rendah" bisa di-index
+    is_low_stock = models.GeneratedField(
+        expression=ExpressionWrapper(Q(stock_quantity__lte=F('minimum_stock')), output_field=models.BooleanField()),
+        output_field=models.BooleanField(),
+        db_persist=True,
+        verbose_name="stok rendah",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -78,6 +108,23 @@ class Product(models.Model):
         verbose_name = "Produk"
         verbose_name_plural = "Produk"
         ordering = ['name']
+        indexes = [
+            # Katalog & keyset pagination (name, id), juga per kategori/supplier
+            models.Index(fields=['name', 'id'], name='core_product_name_id_idx'),
+            models.Index(fields=['category', 'name', 'id'], name='core_product_category_name_idx'),
+            models.Index(fields=['supplier', 'name', 'id'], name='core_product_supplier_name_idx'),
+            # ORDER BY harga jual ... LIMIT (statistik). Sengaja tanpa index tunggal stock_quantity:
+            # kolom itu berubah di setiap mutasi stok, index-nya menambah biaya tulis dan mematikan HOT update
+            models.Index(fields=['selling_price'], name='core_product_selling_idx'),
+            # Partial index: hanya baris stok rendah, urut stok (laporan & hitungan stok rendah)
+            models.Index(fields=['stock_quantity'], condition=Q(is_low_stock=True), name='core_product_low_stock_idx'),
+            # GIN pg_trgm untuk pencarian (core/search.py), hanya dibuat di PostgreSQL (migration 0006).
+            # UPPER(...) cocok dengan SQL `icontains` Django: UPPER("name"::text) LIKE UPPER('%q%')
+            PostgresGinIndex(OpClass(Upper('name'), name='gin_trgm_ops'), name='core_product_name_upper_trgm'),
+            PostgresGinIndex(OpClass(Upper('sku'), name='gin_trgm_ops'), name='core_product_sku_upper_trgm'),
+            # trigram_word_similar pada nama
+            PostgresGinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='core_product_name_trgm'),
+        ]
     
     def __str__(self):
         return f"{self.sku} - {self.name}"
@@ -93,7 +140,8 @@ class StockTransaction(models.Model):
         Product,
         verbose_name="produk",
         on_delete=models.RESTRICT,
-        related_name='transactions'
+        related_name='transactions',
+        db_index=False  # dicakup index (product, -created_at, -id)
     )
     transaction_type = models.CharField(
         "tipe transaksi",
@@ -109,7 +157,9 @@ class StockTransaction(models.Model):
         User,
         verbose_name="dibuat oleh",
         on_delete=models.RESTRICT,
-        related_name='stock_transactions'
+        related_name='stock_transactions',
+        null=True,
+        blank=True,  # kosong = penyesuaian stok oleh sistem (core/services.py set_stock_quantity)
     )
     created_at = models.DateTimeField(auto_now_add=True)
     
@@ -117,6 +167,83 @@ class StockTransaction(models.Model):
         verbose_name = "Transaksi Stok"
         verbose_name_plural = "Transaksi Stok"
         ordering = ['-created_at']
+        indexes = [
+            # Riwayat per produk: WHERE product_id = ? ORDER BY created_at DESC, id DESC
+            models.Index(fields=['product', '-created_at', '-id'], name='core_stocktx_product_idx'),
+            # Laporan rentang tanggal + total per tipe (index-only scan di PostgreSQL)
+            models.Index(fields=['created_at', 'transaction_type'], include=['quantity'], name='core_stocktx_created_type_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.get_transaction_type_display()} - {self.product.name} ({self.quantity})"
\ No newline at end of file
+        # Nama produk hanya dipakai jika sudah di-load (select_related); hindari query per baris
+        product = self.product.name if StockTransaction.product.is_cached(self) else f"#{self.product_id}"
+        return f"{self.get_transaction_type_display()} - {product} ({self.quantity})"
+
+class DailyStockSummary(models.Model):
+    """
+    Rekap harian pergerakan stok per (tanggal, produk, tipe transaksi).
+    Diperbarui oleh core.services setiap kali transaksi dicatat dan dapat
+    dibangun ulang dengan `manage.py rebuild_daily_stock_summary`.
+    Tanggal memakai zona waktu lokal (TIME_ZONE).
+    """
+    date = models.DateField("tanggal")
+    product = models.ForeignKey(
+        Product,
+        verbose_name="produk",
+        on_delete=models.CASCADE,
+        related_name='daily_summaries',
+        db_index=False  # dicakup index (product, date)
+    )
+    transaction_type = models.CharField(
+        "tipe transaksi",
+        max_length=3,
+        choices=TRANSACTION_TYPES
+    )
+    quantity = models.IntegerField("jumlah", default=0)
+    transaction_count = models.IntegerField("jumlah transaksi", default=0)
+
+    class Meta:
+        verbose_name = "Rekap Stok Harian"
+        verbose_name_plural = "Rekap Stok Harian"
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'product', 'transaction_type'],
+                name='core_dailystocksummary_unique_key',
+            ),
+        ]
+        indexes = [
+            # Delta per produk dalam rentang tanggal (subquery stock_as_of/checkpoint)
+            models.Index(fields=['product', 'date'], name='core_dailysummary_product_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.get_transaction_type_display()} - {self.product_id} ({self.quantity})"
+
+
+class StockCheckpoint(models.Model):
+    """
+    Snapshot stok per produk pada akhir tanggal lokal `date`, ditulis berkala
+    (mis. setiap malam) oleh `manage.py create_stock_checkpoint`.
+    Titik awal query stok historis di core/checkpoints.py.
+    """
+    date = models.DateField("tanggal")
+    product = models.ForeignKey(
+        Product,
+        verbose_name="produk",
+        on_delete=models.CASCADE,
+        related_name='checkpoints'
+    )
+    stock_quantity = models.IntegerField("jumlah stok")
+    purchase_price = models.DecimalField("harga beli", max_digits=10, decimal_places=2)
+
+    class Meta:
+        verbose_name = "Checkpoint Stok"
+        verbose_name_plural = "Checkpoint Stok"
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'product'], name='core_stockcheckpoint_unique_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} - {self.product_id} ({self.stock_quantity})"
@@ -0,0 +1,168 @@
+# core/pagination.py
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    """Encode nilai kolom urutan baris terakhir menjadi cursor opaque"""
+    raw = json.dumps(values, default=str, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, fields=None):
+    """
+    Kebalikan dari encode_cursor; raise InvalidCursor jika tidak valid.
+    Jika `fields` (model field per kolom urutan) diberikan, setiap nilai dikonversi
+    dengan field.to_python() sehingga cursor yang dimanipulasi ditolak di sini,
+    bukan gagal di dalam query.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+    if not isinstance(values, list):
+        raise InvalidCursor('Invalid cursor')
+    if fields is None:
+        return values
+    if len(values) != len(fields):
+        raise InvalidCursor('Invalid cursor')
+    try:
+        values = [field.to_python(value) for field, value in zip(fields, values)]
+    except (ValidationError, ValueError, TypeError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+    if any(value is None for value in values):
+        raise InvalidCursor('Invalid cursor')
+    return values
+
+
+class CountedPaginator(Paginator):
+    """
+    Paginator offset biasa dengan jumlah baris yang sudah diketahui (mis. dari aggregate
+    ringkasan laporan), sehingga tidak menjalankan COUNT(*) sendiri.
+    """
+
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count = count
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    if value in (None, ''):
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        raise InvalidCursor('limit must be an integer')
+    if limit < 1:
+        raise InvalidCursor('limit must be positive')
+    return min(limit, maximum)
+
+
+def _after(ordering, values):
+    """
+    Bangun filter keyset "baris setelah cursor" untuk ordering seperti
+    ('name', 'id') atau ('-created_at', '-id'):
+    (a > x) OR (a = x AND b > y) ...
+    """
+    condition = Q()
+    for i, field in reversed(list(enumerate(ordering))):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        step = Q(**{f'{name}__{lookup}': values[i]})
+        if i < len(ordering) - 1:
+            step |= Q(**{name: values[i]}) & condition
+        condition = step
+    # Batas redundan pada kolom pertama (a >= x) supaya index bisa dipakai sebagai range scan
+    first = ordering[0]
+    bound = Q(**{f"{first.lstrip('-')}__{'lte' if first.startswith('-') else 'gte'}": values[0]})
+    return bound & condition
+
+
+def _fetch(queryset, ordering, cursor, limit):
+    """Baris setelah cursor menurut ordering, plus flag apakah masih ada baris berikutnya"""
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, [_ordering_field(queryset, f.lstrip('-')) for f in ordering])
+        queryset = queryset.filter(_after(ordering, values))
+    rows = list(queryset[:limit + 1])
+    return rows[:limit], len(rows) > limit
+
+
+def _ordering_field(queryset, name):
+    """Field model (atau output_field anotasi) untuk kolom urutan `name`"""
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    return queryset.model._meta.pk if name == 'pk' else queryset.model._meta.get_field(name)
+
+
+def _reverse(ordering):
+    return tuple(f[1:] if f.startswith('-') else f'-{f}' for f in ordering)
+
+
+def _cursor_for(row, ordering):
+    return encode_cursor([_value(row, f.lstrip('-')) for f in ordering])
+
+
+def keyset_page(queryset, ordering, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Ambil satu halaman queryset dengan keyset pagination.
+    Biaya halaman ke-N sama dengan halaman pertama karena tidak memakai OFFSET.
+    Mengembalikan (rows, next_cursor); next_cursor None di halaman terakhir.
+    """
+    rows, more = _fetch(queryset, ordering, cursor, limit)
+    return rows, _cursor_for(rows[-1], ordering) if more else None
+
+
+def keyset_window(queryset, ordering, after=None, before=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Keyset pagination dua arah untuk halaman HTML: `after` menuju halaman berikutnya,
+    `before` ke halaman sebelumnya (dibaca dengan urutan terbalik lalu dibalik lagi).
+    Mengembalikan (rows, previous_cursor, next_cursor); cursor None jika halaman itu tidak ada.
+    """
+    if before:
+        rows, more = _fetch(queryset, _reverse(ordering), before, limit)
+        rows.reverse()
+        has_previous, has_next = more, True
+    else:
+        rows, more = _fetch(queryset, ordering, after, limit)
+        has_previous, has_next = bool(after), more
+    if not rows:
+        return rows, None, None
+    return (rows,
+            _cursor_for(rows[0], ordering) if has_previous else None,
+            _cursor_for(rows[-1], ordering) if has_next else None)
+
+
+def estimate_count(queryset):
+    """
+    Perkiraan jumlah baris queryset dari statistik planner PostgreSQL (EXPLAIN),
+    tanpa COUNT(*) yang harus memindai semua baris. Backend lain memakai count() biasa.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Plan']['Plan Rows']
+
+
+def _value(row, name):
+    value = row[name] if isinstance(row, dict) else getattr(row, name)
+    return value.isoformat() if hasattr(value, 'isoformat') else value
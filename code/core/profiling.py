@@ -0,0 +1,69 @@
+# core/profiling.py
+"""
+Lapisan profiling yang bisa diatur lewat PROFILING_MODE:
+
+- off: silk tidak dipasang sama sekali.
+- sampled: silk (cProfile + SQL) hanya untuk 1 dari PROFILING_SAMPLE_RATE request.
+- full: silk untuk semua request (perilaku lama, hanya untuk development).
+
+Request yang lebih lambat dari PROFILING_SLOW_MS selalu dicatat ringkas ke
+PROFILING_SLOW_LOG oleh SlowRequestMiddleware (satu perf_counter per request).
+Data silk ditulis ke alias database 'profiling' (ProfilingRouter), bukan database utama.
+"""
+import json
+import logging
+import random
+import time
+
+from django.conf import settings
+
+PROFILING_DB = 'profiling'
+
+slow_logger = logging.getLogger('core.profiling.slow')
+
+
+def should_profile(request):
+    """SILKY_INTERCEPT_FUNC untuk mode sampled: 1 dari N request"""
+    rate = settings.PROFILING_SAMPLE_RATE
+    return rate > 0 and random.randrange(rate) == 0
+
+
+class ProfilingRouter:
+    """Arahkan semua model silk ke alias 'profiling' agar profiling tidak menambah beban tulis database utama"""
+
+    def db_for_read(self, model, **hints):
+        return PROFILING_DB if model._meta.app_label == 'silk' else None
+
+    def db_for_write(self, model, **hints):
+        return PROFILING_DB if model._meta.app_label == 'silk' else None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db == PROFILING_DB:
+            return app_label == 'silk'
+        return False if app_label == 'silk' else None
+
+
+class SlowRequestMiddleware:
+    """Catat request di atas PROFILING_SLOW_MS sebagai satu baris JSON; letakkan paling awal di MIDDLEWARE"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = settings.PROFILING_SLOW_MS / 1000
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+        if elapsed >= self.threshold:
+            match = request.resolver_match
+            slow_logger.warning(json.dumps({
+                'method': request.method,
+                'path': request.path,
+                'view': match.view_name if match else None,
+                'status': response.status_code,
+                'duration_ms': round(elapsed * 1000, 1),
+            }))
+        return response
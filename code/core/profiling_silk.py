@@ -0,0 +1,25 @@
+# core/profiling_silk.py
+# Terpisah dari core/profiling.py: modul ini mengimport silk, sedangkan core/profiling.py diimport settings
+import logging
+
+from django.db import DatabaseError
+from silk.collector import DataCollector
+from silk.middleware import SilkyMiddleware
+
+logger = logging.getLogger('core.profiling')
+
+
+class SafeSilkyMiddleware(SilkyMiddleware):
+    """
+    SilkyMiddleware yang tidak pernah menggagalkan request: jika database profiling
+    tidak tersedia (belum di-migrate, terkunci, dsb.) request tetap dilayani tanpa profiling.
+    Kegagalan saat menyimpan response sudah ditangani silk sendiri (process_response).
+    """
+
+    def process_request(self, request):
+        try:
+            super().process_request(request)
+        except DatabaseError:
+            logger.warning('Silk profiling dilewati untuk %s', request.path, exc_info=True)
+            request.silk_is_intercepted = False
+            DataCollector().clear()
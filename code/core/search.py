@@ -0,0 +1,38 @@
+# core/search.py
+from django.contrib.postgres.search import TrigramSimilarity, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Q
+from django.db.models.functions import Greatest
+
+SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 200
+
+
+def _use_trigram():
+    return connection.vendor == 'postgresql'
+
+
+def filter_products(queryset, query):
+    """
+    Filter produk berdasarkan nama/SKU.
+    PostgreSQL: icontains dilayani index GIN pg_trgm pada UPPER(name)/UPPER(sku)
+    (migration 0006), ditambah pencocokan fuzzy word-similarity pada nama.
+    Engine lain: perilaku lama (icontains).
+    """
+    condition = Q(name__icontains=query) | Q(sku__icontains=query)
+    if _use_trigram():
+        condition |= Q(name__trigram_word_similar=query)
+    return queryset.filter(condition)
+
+
+def search_products(queryset, query, limit=SEARCH_LIMIT):
+    """Produk yang cocok dengan query, diurutkan berdasarkan relevansi (trigram similarity)"""
+    queryset = filter_products(queryset, query)
+    if _use_trigram():
+        queryset = queryset.annotate(rank=Greatest(
+            TrigramWordSimilarity(query, 'name'),
+            TrigramSimilarity('sku', query),
+        )).order_by('-rank', 'name', 'id')
+    else:
+        queryset = queryset.order_by('name', 'id')
+    return queryset[:limit]
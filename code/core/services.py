@@ -0,0 +1,247 @@
+# core/services.py
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, IntegerField, Sum, Value, When
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .cache import bump_stock_version
+from .dates import local_day_start
+from .models import DailyStockSummary, Product, StockTransaction
+
+MAX_BATCH_SIZE = 5000
+
+
+class InsufficientStock(ValueError):
+    """Stok keluar melebihi stok tersedia; tidak ada yang ditulis"""
+
+    def __init__(self, product_id, available, requested):
+        self.product_id, self.available, self.requested = product_id, available, requested
+        super().__init__(f'Insufficient stock for product {product_id}: {available} available, {requested} requested')
+
+
+def signed_quantity(transaction_type, quantity):
+    return quantity if transaction_type == 'IN' else -quantity
+
+
+def apply_stock_delta(product_id, delta):
+    """
+    Ubah stok produk secara atomik di database: UPDATE ... SET stock_quantity =
+    stock_quantity + delta WHERE stock_quantity + delta >= 0. UPDATE mengunci baris
+    produk dan kondisinya dievaluasi ulang setelah lock didapat, sehingga tidak ada
+    update yang hilang dan stok tidak pernah negatif. Stok yang tidak mencukupi
+    -> InsufficientStock, bukan dibatasi diam-diam ke 0 (ledger tetap sama dengan stok).
+    """
+    updated = Product.objects.filter(pk=product_id, stock_quantity__gte=-delta).update(
+        stock_quantity=F('stock_quantity') + delta,
+        updated_at=timezone.now(),
+    )
+    if not updated:
+        available = Product.objects.filter(pk=product_id).values_list('stock_quantity', flat=True).first()
+        if available is not None:
+            raise InsufficientStock(product_id, available, -delta)
+    # QuerySet.update() tidak memicu post_save, jadi cache valuasi di-invalidasi di sini
+    transaction.on_commit(bump_stock_version)
+    return updated
+
+
+def add_to_daily_summary(date, product_id, transaction_type, quantity, count=1):
+    """
+    Tambahkan quantity/count ke baris DailyStockSummary (upsert dengan increment F()).
+    Nilai negatif dipakai untuk mengoreksi transaksi yang diubah/dihapus.
+    """
+    key = {'date': date, 'product_id': product_id, 'transaction_type': transaction_type}
+    increments = {'quantity': F('quantity') + quantity, 'transaction_count': F('transaction_count') + count}
+    if DailyStockSummary.objects.filter(**key).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            DailyStockSummary.objects.create(quantity=quantity, transaction_count=count, **key)
+    except IntegrityError:
+        # Baris dibuat oleh request lain di antara UPDATE dan INSERT
+        DailyStockSummary.objects.filter(**key).update(**increments)
+
+
+def summarize_movement(movement, sign=1):
+    """Masukkan (sign=1) atau keluarkan (sign=-1) satu transaksi dari rekap harian"""
+    add_to_daily_summary(
+        timezone.localdate(movement.created_at), movement.product_id,
+        movement.transaction_type, sign * movement.quantity, sign,
+    )
+
+
+def add_many_to_daily_summary(totals):
+    """
+    Versi batch add_to_daily_summary. totals: {(date, product_id, type): (quantity, count)}.
+    Baris yang ada dikunci dan di-update sekaligus (bulk_update), yang belum ada di-bulk_create.
+    Kandidat dikunci dengan date IN (...) AND product_id IN (...) lalu dicocokkan per key
+    di Python: OR per key membuat predikat sebesar batch (SQLite: "Expression tree is too large").
+    """
+    if not totals:
+        return
+    dates = {date for date, _, _ in totals}
+    product_ids = {product_id for _, product_id, _ in totals}
+    candidates = (DailyStockSummary.objects.select_for_update()
+                  .filter(date__in=dates, product_id__in=product_ids).order_by('pk'))
+    existing = [row for row in candidates if (row.date, row.product_id, row.transaction_type) in totals]
+    for row in existing:
+        quantity, count = totals[(row.date, row.product_id, row.transaction_type)]
+        row.quantity += quantity
+        row.transaction_count += count
+    DailyStockSummary.objects.bulk_update(existing, ['quantity', 'transaction_count'], batch_size=1000)
+
+    found = {(row.date, row.product_id, row.transaction_type) for row in existing}
+    missing = [key for key in totals if key not in found]
+    try:
+        with transaction.atomic():
+            DailyStockSummary.objects.bulk_create([
+                DailyStockSummary(date=key[0], product_id=key[1], transaction_type=key[2],
+                                  quantity=totals[key][0], transaction_count=totals[key][1])
+                for key in missing
+            ])
+    except IntegrityError:
+        # Ada baris yang dibuat request lain; jatuh kembali ke upsert per baris
+        for key in missing:
+            add_to_daily_summary(*key, *totals[key])
+
+
+def rebuild_daily_summary(since=None, batch_size=5000, summary_model=DailyStockSummary,
+                          transaction_model=StockTransaction):
+    """
+    Bangun ulang DailyStockSummary dari ledger (seluruhnya, atau mulai tanggal lokal `since`)
+    dalam satu transaksi. summary_model/transaction_model dapat diganti model historis
+    dari migration. Mengembalikan jumlah baris yang ditulis.
+    """
+    # TruncDate memakai zona waktu aktif (TIME_ZONE), sama dengan summarize_movement
+    rows = (transaction_model.objects
+            .annotate(day=TruncDate('created_at'))
+            .values('day', 'product_id', 'transaction_type')
+            .annotate(total=Sum('quantity'), count=Count('id'))
+            .order_by())
+    existing = summary_model.objects.all()
+    if since:
+        rows = rows.filter(created_at__gte=local_day_start(since))
+        existing = existing.filter(date__gte=since)
+
+    with transaction.atomic():
+        existing.delete()
+        batch, created = [], 0
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(summary_model(
+                date=row['day'], product_id=row['product_id'], transaction_type=row['transaction_type'],
+                quantity=row['total'], transaction_count=row['count'],
+            ))
+            if len(batch) >= batch_size:
+                summary_model.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        summary_model.objects.bulk_create(batch)
+        created += len(batch)
+    return created
+
+
+def record_stock_movement(product, transaction_type, quantity, user, notes=''):
+    """
+    Catat StockTransaction dan sesuaikan Product.stock_quantity dalam satu transaksi DB.
+    Stok keluar melebihi stok tersedia -> InsufficientStock dan tidak ada yang dicatat.
+    `user` boleh None untuk penyesuaian oleh sistem.
+    Catatan: nilai stock_quantity pada instance `product` tidak diperbarui.
+    """
+    with transaction.atomic():
+        # Stok diubah lebih dulu: baris produk terkunci sampai commit, dan stok kurang gagal sebelum INSERT
+        apply_stock_delta(product.pk, signed_quantity(transaction_type, quantity))
+        movement = StockTransaction.objects.create(
+            product=product,
+            transaction_type=transaction_type,
+            quantity=quantity,
+            notes=notes,
+            created_by=user,
+        )
+        summarize_movement(movement)
+    return movement
+
+
+def record_stock_movements(movements, user):
+    """
+    Catat banyak pergerakan stok sekaligus dalam satu transaksi DB.
+    movements: list of dict {product_id, transaction_type, quantity, notes} yang sudah divalidasi.
+    Biaya query konstan: satu bulk INSERT transaksi, satu UPDATE stok terkelompok
+    (CASE per produk), dan beberapa query untuk rekap harian.
+    Stok dicek terhadap selisih bersih per produk pada baris yang sudah dikunci;
+    jika ada produk yang stoknya tidak mencukupi -> InsufficientStock dan tidak ada yang dicatat.
+    Mengembalikan list StockTransaction sesuai urutan input.
+    """
+    if len(movements) > MAX_BATCH_SIZE:
+        raise ValueError(f'At most {MAX_BATCH_SIZE} movements per batch')
+
+    deltas, totals = {}, {}
+    for m in movements:
+        deltas[m['product_id']] = deltas.get(m['product_id'], 0) + signed_quantity(m['transaction_type'], m['quantity'])
+    deltas = {pk: delta for pk, delta in deltas.items() if delta}
+
+    with transaction.atomic():
+        if deltas:
+            # Kunci baris produk dengan urutan id yang konsisten untuk menghindari deadlock antar batch
+            stock = dict(Product.objects.select_for_update().filter(pk__in=deltas).order_by('pk')
+                         .values_list('pk', 'stock_quantity'))
+            for pk in sorted(deltas):
+                if stock[pk] + deltas[pk] < 0:
+                    raise InsufficientStock(pk, stock[pk], -deltas[pk])
+            delta_expr = Case(*[When(pk=pk, then=Value(delta)) for pk, delta in deltas.items()],
+                              default=Value(0), output_field=IntegerField())
+            Product.objects.filter(pk__in=deltas).update(
+                stock_quantity=F('stock_quantity') + delta_expr,
+                updated_at=timezone.now(),
+            )
+
+        created = StockTransaction.objects.bulk_create([
+            StockTransaction(product_id=m['product_id'], transaction_type=m['transaction_type'],
+                             quantity=m['quantity'], notes=m.get('notes', ''), created_by=user)
+            for m in movements
+        ])
+        for movement in created:
+            key = (timezone.localdate(movement.created_at), movement.product_id, movement.transaction_type)
+            quantity, count = totals.get(key, (0, 0))
+            totals[key] = (quantity + movement.quantity, count + 1)
+        add_many_to_daily_summary(totals)
+        # bulk_create/update tidak memicu signal
+        transaction.on_commit(bump_stock_version)
+    return created
+
+
+def update_stock_movement(movement):
+    """
+    Simpan perubahan pada StockTransaction yang sudah ada (mis. dari admin) dan
+    koreksi stok dengan selisih antara nilai lama dan nilai baru.
+    """
+    with transaction.atomic():
+        old = StockTransaction.objects.select_for_update().get(pk=movement.pk)
+        movement.save()
+        summarize_movement(old, sign=-1)
+        summarize_movement(movement)
+        old_delta = signed_quantity(old.transaction_type, old.quantity)
+        new_delta = signed_quantity(movement.transaction_type, movement.quantity)
+        if old.product_id == movement.product_id:
+            if new_delta != old_delta:
+                apply_stock_delta(movement.product_id, new_delta - old_delta)
+        else:
+            apply_stock_delta(old.product_id, -old_delta)
+            apply_stock_delta(movement.product_id, new_delta)
+    return movement
+
+
+def set_stock_quantity(product_id, stock_quantity, user=None, notes='Penyesuaian stok'):
+    """
+    Set stok ke nilai absolut. Baris produk dikunci (SELECT ... FOR UPDATE) agar
+    selisihnya akurat; selisih selalu dicatat sebagai StockTransaction (created_by
+    kosong jika user tidak diketahui) sehingga ledger tetap sama dengan stok.
+    Mengembalikan produk dengan stock_quantity yang baru.
+    """
+    if stock_quantity < 0:
+        raise ValueError('stock_quantity must not be negative')
+    with transaction.atomic():
+        product = Product.objects.select_for_update().only('id', 'sku', 'stock_quantity').get(pk=product_id)
+        delta = stock_quantity - product.stock_quantity
+        if delta:
+            record_stock_movement(product, 'IN' if delta > 0 else 'OUT', abs(delta), user, notes=notes)
+        product.stock_quantity = stock_quantity
+    return product
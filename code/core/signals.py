@@ -0,0 +1,26 @@
+# core/signals.py
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import VERSIONED_MODELS, bump_model_versions
+from .models import StockTransaction
+from .services import summarize_movement
+
+
+@receiver(post_delete, sender=StockTransaction)
+def remove_deleted_movement_from_summary(sender, instance, **kwargs):
+    """Transaksi yang dihapus (mis. superuser di admin) dikeluarkan dari rekap harian"""
+    summarize_movement(instance, sign=-1)
+
+
+def invalidate_valuation_cache(sender, **kwargs):
+    # Bump setelah commit, supaya request lain tidak meng-cache data lama di versi baru
+    transaction.on_commit(partial(bump_model_versions, sender))
+
+
+for model in VERSIONED_MODELS:
+    post_save.connect(invalidate_valuation_cache, sender=model)
+    post_delete.connect(invalidate_valuation_cache, sender=model)
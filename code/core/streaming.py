@@ -0,0 +1,102 @@
+# core/streaming.py
+import csv
+import json
+import zlib
+from datetime import datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+STREAM_CHUNK_SIZE = 2000
+# Awalan sel yang dieksekusi spreadsheet sebagai formula (CSV/formula injection)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _dumps(obj):
+    return json.dumps(obj, cls=DjangoJSONEncoder, separators=(',', ':'))
+
+
+def _ndjson_lines(rows, serialize):
+    for row in rows:
+        yield _dumps(serialize(row)) + '\n'
+
+
+def _json_array(key, rows, serialize):
+    yield '{%s:[' % _dumps(key)
+    first = True
+    for row in rows:
+        yield ('' if first else ',') + _dumps(serialize(row))
+        first = False
+    yield ']}'
+
+
+def stream_queryset(queryset, serialize, fmt='ndjson', key='items', chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Stream queryset sebagai NDJSON (satu objek per baris) atau JSON object
+    {key: [...]} tanpa menampung seluruh hasil di memori.
+    Baris dibaca lewat .iterator() sehingga PostgreSQL memakai server-side cursor.
+    """
+    rows = queryset.iterator(chunk_size=chunk_size)
+    if fmt == 'ndjson':
+        return StreamingHttpResponse(_ndjson_lines(rows, serialize), content_type='application/x-ndjson')
+    return StreamingHttpResponse(_json_array(key, rows, serialize), content_type='application/json')
+
+
+class _Echo:
+    """File-like untuk csv.writer: writerow() langsung mengembalikan baris yang ditulis"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_cell(value):
+    # Waktu dalam zona lokal (TIME_ZONE), sama seperti laporan HTML
+    if isinstance(value, datetime) and timezone.is_aware(value):
+        return timezone.localtime(value).strftime('%Y-%m-%d %H:%M:%S')
+    # Teks bebas (nama, catatan) diawali ' agar tidak dijalankan sebagai formula
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_lines(headers, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow([_csv_cell(value) for value in row])
+
+
+def _gzip(chunks, min_size=64 * 1024):
+    # wbits=31: format gzip; output ditahan sampai min_size agar tidak mengirim potongan kecil
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            buffer.append(data)
+            size += len(data)
+        if size >= min_size:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    buffer.append(compressor.flush())
+    yield b''.join(buffer)
+
+
+def stream_csv(queryset, columns, filename, compress=False, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Stream queryset sebagai CSV (opsional gzip) untuk diunduh.
+    `columns` adalah pasangan (header, field/annotation); baris diambil dengan
+    values_list() lewat server-side cursor, sehingga memori tetap konstan.
+    """
+    headers = [header for header, _ in columns]
+    rows = queryset.values_list(*(field for _, field in columns)).iterator(chunk_size=chunk_size)
+    content = _csv_lines(headers, rows)
+    if compress:
+        response = StreamingHttpResponse(_gzip(content), content_type='application/gzip')
+        filename += '.gz'
+    else:
+        response = StreamingHttpResponse(content, content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
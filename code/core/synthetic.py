@@ -0,0 +1,200 @@
+# core/synthetic.py
+"""
+Generator dataset sintetis untuk uji beban & skala (manage.py generate_inventory).
+
+Popularitas produk mengikuti distribusi Zipf, harga log-normal, dan setiap produk
+mendapat ledger kronologis (penerimaan awal, penjualan, restock) sehingga
+Product.stock_quantity sama persis dengan saldo ledger-nya. Produk beserta
+transaksinya dibangkitkan per chunk di process pool; di PostgreSQL setiap worker
+menulis chunk-nya sendiri dengan COPY, di database lain proses utama menulis
+dengan executemany. Rekap harian (DailyStockSummary) ditulis bersama chunk-nya.
+"""
+import io
+import math
+import multiprocessing
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+ZIPF_EXPONENT = 0.8
+
+PRODUCT_WORDS = ['Beras', 'Gula', 'Minyak Goreng', 'Tepung Terigu', 'Kopi', 'Teh', 'Susu', 'Sabun Mandi',
+                 'Sampo', 'Pasta Gigi', 'Deterjen', 'Kabel', 'Lampu LED', 'Baterai', 'Buku Tulis', 'Pulpen',
+                 'Kaos', 'Kemeja', 'Sepatu', 'Bola', 'Vitamin', 'Masker', 'Piring', 'Gelas', 'Panci']
+VARIANTS = ['Premium', 'Ekonomis', 'Original', 'Super', 'Mini', 'Jumbo', 'Lite', 'Pro', 'Classic', 'Plus']
+SIZES = ['250g', '500g', '1kg', '5kg', '1L', '2L', 'S', 'M', 'L', 'XL', 'Isi 10', 'Isi 24']
+
+
+def _coprime_multiplier(n):
+    """Pengali untuk mengacak peringkat popularitas (index * m mod n) tanpa tabrakan"""
+    m = 1_000_003
+    while math.gcd(m, n) != 1:
+        m += 2
+    return m
+
+
+def _product_ledger(rng, count, start, span_seconds, minimum_stock, user_ids):
+    """
+    Ledger kronologis satu produk: penerimaan awal, lalu penjualan selama stok di atas
+    minimum dan restock begitu stok menyentuh minimum. OUT tidak pernah melebihi stok,
+    sehingga saldo akhir tidak pernah dipotong ke 0.
+    Mengembalikan (rows, saldo_akhir); row = (type, quantity, notes, user_id, created_at).
+    """
+    offsets = sorted(rng.random() * span_seconds for _ in range(count))
+    stock, rows = 0, []
+    for i, offset in enumerate(offsets):
+        created_at = start + timedelta(seconds=offset)
+        if stock > minimum_stock:
+            quantity = min(stock, max(1, int(rng.expovariate(1 / 4))))
+            rows.append(('OUT', quantity, 'Penjualan', rng.choice(user_ids), created_at))
+            stock -= quantity
+        else:
+            quantity = rng.randint(minimum_stock * 2, minimum_stock * 10)
+            rows.append(('IN', quantity, 'Penerimaan dari supplier' if i else 'Stok awal',
+                         rng.choice(user_ids), created_at))
+            stock += quantity
+    return rows, stock
+
+
+def build_chunk(spec):
+    """
+    Bangkitkan satu chunk produk beserta ledger dan rekap hariannya.
+    Deterministik untuk (seed, first_index) yang sama, berapapun jumlah worker.
+    """
+    from django.utils import timezone
+
+    rng = random.Random(spec['seed'] * 1_000_003 + spec['first_index'])
+    span_seconds = spec['days'] * 24 * 3600
+    start = spec['end'] - timedelta(seconds=span_seconds)
+    products, transactions, summaries = [], [], {}
+    for index in range(spec['first_index'], spec['first_index'] + spec['count']):
+        product_id = spec['first_id'] + index
+        rank = (index * spec['multiplier']) % spec['n_products'] + 1
+        expected = spec['n_transactions'] * rank ** -ZIPF_EXPONENT / spec['harmonic']
+        count = max(1, int(expected + rng.random()))
+
+        purchase = max(Decimal(500), Decimal(round(rng.lognormvariate(math.log(25000), 1.0), -2)))
+        selling = Decimal(round(float(purchase) * rng.uniform(1.05, 1.6), -2))
+        minimum_stock = rng.randint(5, 50)
+        ledger, stock = _product_ledger(rng, count, start, span_seconds, minimum_stock, spec['user_ids'])
+        name = f"{rng.choice(PRODUCT_WORDS)} {rng.choice(VARIANTS)} {rng.choice(SIZES)}"
+        products.append((product_id, f'GEN{product_id:09d}', name, rng.choice(spec['category_ids']),
+                         rng.choice(spec['supplier_ids']), purchase, selling, stock, minimum_stock,
+                         start, ledger[-1][4]))
+        for row in ledger:
+            transactions.append((product_id, *row))
+            # Produk di chunk ini baru, jadi rekap hariannya bisa langsung ditulis tanpa upsert
+            key = (timezone.localdate(row[4]), product_id, row[0])
+            quantity, tx_count = summaries.get(key, (0, 0))
+            summaries[key] = (quantity + row[1], tx_count + 1)
+    summaries = [(*key, quantity, tx_count) for key, (quantity, tx_count) in summaries.items()]
+    return products, transactions, summaries
+
+
+def _columns():
+    from .models import DailyStockSummary, Product, StockTransaction
+
+    product_columns = ['id', 'sku', 'name', 'category_id', 'supplier_id', 'purchase_price', 'selling_price',
+                       'stock_quantity', 'minimum_stock', 'created_at', 'updated_at']
+    tx_columns = ['product_id', 'transaction_type', 'quantity', 'notes', 'created_by_id', 'created_at']
+    summary_columns = ['date', 'product_id', 'transaction_type', 'quantity', 'transaction_count']
+    return [(Product._meta.db_table, product_columns), (StockTransaction._meta.db_table, tx_columns),
+            (DailyStockSummary._meta.db_table, summary_columns)]
+
+
+def _copy_rows(cursor, table, columns, rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(v.isoformat() if hasattr(v, 'isoformat') else str(v) for v in row))
+        buffer.write('\n')
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+
+def _insert_rows(cursor, connection, table, columns, rows):
+    ops = connection.ops
+
+    def adapt(value):
+        if isinstance(value, datetime):
+            return ops.adapt_datetimefield_value(value)
+        if isinstance(value, date):
+            return ops.adapt_datefield_value(value)
+        return value
+
+    rows = [[adapt(v) for v in row] for row in rows]
+    placeholders = ', '.join(['%s'] * len(columns))
+    cursor.executemany(
+        f"INSERT INTO {ops.quote_name(table)} ({', '.join(map(ops.quote_name, columns))}) VALUES ({placeholders})",
+        rows,
+    )
+
+
+def write_chunk(products, transactions, summaries):
+    """Tulis satu chunk dalam satu transaksi: COPY di PostgreSQL, executemany di database lain"""
+    from django.db import connection, transaction
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for (table, columns), rows in zip(_columns(), (products, transactions, summaries)):
+            if connection.vendor == 'postgresql':
+                _copy_rows(cursor, table, columns, rows)
+            else:
+                _insert_rows(cursor, connection, table, columns, rows)
+    return len(products), len(transactions)
+
+
+def _build_and_write(spec):
+    return write_chunk(*build_chunk(spec))
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def generate(n_products, n_transactions, days=365, category_ids=(), supplier_ids=(), user_ids=(),
+             chunk_size=2000, workers=None, seed=0):
+    """
+    Bangkitkan n_products produk dan kira-kira n_transactions transaksi (setiap produk
+    minimal satu, jadi total aktual bisa sedikit berbeda). Mengembalikan generator
+    (products, transactions) per chunk yang sudah ditulis, untuk pelaporan progres.
+    """
+    from django.db import connection, connections
+    from django.db.models import Max
+    from django.utils import timezone
+
+    from .models import Product
+
+    first_id = (Product.objects.aggregate(Max('id'))['id__max'] or 0) + 1
+    base = {
+        'first_id': first_id, 'n_products': n_products, 'n_transactions': n_transactions,
+        'harmonic': sum(rank ** -ZIPF_EXPONENT for rank in range(1, n_products + 1)),
+        'multiplier': _coprime_multiplier(n_products), 'days': days, 'end': timezone.now(), 'seed': seed,
+        'category_ids': list(category_ids), 'supplier_ids': list(supplier_ids), 'user_ids': list(user_ids),
+    }
+    specs = [{**base, 'first_index': i, 'count': min(chunk_size, n_products - i)}
+             for i in range(0, n_products, chunk_size)]
+
+    if workers == 1:
+        for spec in specs:
+            yield write_chunk(*build_chunk(spec))
+    else:
+        # Koneksi tidak boleh diwariskan ke proses anak
+        connections.close_all()
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+        with context.Pool(workers, initializer=_init_worker) as pool:
+            if connection.vendor == 'postgresql':
+                # Setiap worker menulis chunk-nya sendiri secara paralel
+                yield from pool.imap_unordered(_build_and_write, specs)
+            else:
+                # SQLite dkk. hanya mengizinkan satu penulis; worker cukup membangkitkan baris
+                for chunk in pool.imap_unordered(build_chunk, specs):
+                    yield write_chunk(*chunk)
+
+    if connection.vendor == 'postgresql':
+        from django.core.management.color import no_style
+        from .models import StockTransaction
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Product, StockTransaction]):
+                cursor.execute(sql)
@@ -1,3 +1,629 @@
-from django.test import TestCase
+import csv
+import gzip
+import json
+import os
+import runpy
+import tempfile
+import unittest
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+from io import StringIO
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from .budgets import QueryBudgetExceeded, QueryBudgetMiddleware, install_counter, query_budget
+from .cache import category_valuation
+from .checkpoints import create_checkpoint
+from .dates import filter_local_dates
+from .importing import PRODUCT_COLUMNS, CSVImportError, copy_products, upsert_products
+from .models import Category, DailyStockSummary, Product, StockTransaction, Supplier
+from .pagination import encode_cursor, keyset_window
+from .profiling import should_profile
+from .services import InsufficientStock, record_stock_movement, record_stock_movements, set_stock_quantity
+from .urls import urlpatterns
+from .views import HOME_PAGE_SIZE, dashboard_stats_html as async_dashboard_stats_html
+
+dashboard_stats_html = async_to_sync(async_dashboard_stats_html)
+
+
+# Manifest static storage membutuhkan collectstatic; tidak relevan untuk test
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class InventoryTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('staff', password='staff12345')
+        cls.category = Category.objects.create(name='Elektronik')
+        cls.supplier = Supplier.objects.create(name='PT Elektronik Jaya', phone='021-1234567', address='Jakarta')
+        cls.products = [
+            Product.objects.create(
+                sku=f'ELK{i:03d}', name=f'Produk {i}', category=cls.category, supplier=cls.supplier,
+                purchase_price=Decimal('1000') * i, selling_price=Decimal('1000') * i + Decimal('100') * (i % 4),
+                stock_quantity=i * 3, minimum_stock=10,
+            )
+            for i in range(1, 13)
+        ]
+        for product in cls.products[:4]:
+            record_stock_movement(product, 'IN', 5, cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+
+
+class DashboardStatsTests(InventoryTestCase):
+    def test_rankings_computed_in_database(self):
+        response = dashboard_stats_html(self.factory.get('/dashboard/'))
+        self.assertEqual(response.status_code, 200)
+
+        products = list(Product.objects.all())
+        by_value = sorted(products, key=lambda p: (-(p.stock_quantity * p.purchase_price), p.id))[:5]
+        with_margin = [p for p in products if p.selling_price != p.purchase_price]
+        by_margin = sorted(with_margin, key=lambda p: (-(p.selling_price - p.purchase_price) / p.purchase_price, p.id))[:5]
+
+        self.assertContains(response, by_value[0].name)
+        self.assertContains(response, by_margin[0].name)
+
+    def test_query_count(self):
+        request = self.factory.get('/dashboard/')
+        # Cache valuasi kategori/supplier masih kosong
+        with self.assertNumQueries(8):
+            dashboard_stats_html(request)
+        # Cache valuasi terisi
+        with self.assertNumQueries(6):
+            dashboard_stats_html(request)
+
+
+class ProfilingModeTests(SimpleTestCase):
+    def _settings(self, mode):
+        with mock.patch.dict(os.environ, {'PROFILING_MODE': mode}):
+            return runpy.run_path(os.path.join(os.path.dirname(__file__), '..', 'simplelms', 'settings.py'))
+
+    def test_mode_selects_middleware(self):
+        silk = 'core.profiling_silk.SafeSilkyMiddleware'
+        off = self._settings('off')
+        self.assertNotIn(silk, off['MIDDLEWARE'])
+        self.assertNotIn('profiling', off['DATABASES'])
+
+        for mode in ('sampled', 'full'):
+            with self.subTest(mode=mode):
+                result = self._settings(mode)
+                middleware = result['MIDDLEWARE']
+                self.assertEqual(middleware.index(silk) + 1, middleware.index('core.budgets.QueryBudgetMiddleware'))
+                self.assertIn('silk', result['INSTALLED_APPS'])
+                self.assertEqual(result['DATABASE_ROUTERS'], ['core.profiling.ProfilingRouter'])
+        self.assertIs(self._settings('sampled')['SILKY_INTERCEPT_FUNC'], should_profile)
+        self.assertNotIn('SILKY_INTERCEPT_FUNC', self._settings('full'))
+
+
+@override_settings(QUERY_BUDGET_MODE='raise')
+class QueryBudgetTests(InventoryTestCase):
+    """Setiap view ber-budget di core/urls.py diminta dengan cache dingin; melebihi budget -> QueryBudgetExceeded"""
+
+    def setUp(self):
+        super().setUp()
+        install_counter(connection)
+
+    def _kwargs(self, pattern):
+        ids = {'pk': self.products[0].pk, 'product_id': self.products[0].pk,
+               'category_id': self.category.pk, 'supplier_id': self.supplier.pk}
+        return {name: ids[name] for name in pattern.pattern.converters}
+
+    def test_read_views_within_budget(self):
+        self.client.force_login(self.user)
+        for pattern in urlpatterns:
+            if getattr(pattern.callback, 'query_budget', None) is None or pattern.name == 'api_stock_movements_batch':
+                continue
+            with self.subTest(pattern.name):
+                cache.clear()
+                response = self.client.get(reverse(pattern.name, kwargs=self._kwargs(pattern)), {'q': 'Produk'})
+                self.assertEqual(response.status_code, 200)
+
+    def test_batch_movements_within_budget(self):
+        self.client.force_login(self.user)
+        movements = [{'sku': p.sku, 'type': 'OUT' if i % 2 else 'IN', 'quantity': 1}
+                     for i, p in enumerate(self.products)]
+        response = self.client.post(reverse('api_stock_movements_batch'), json.dumps(movements),
+                                    content_type='application/json')
+        self.assertEqual(response.json()['recorded'], len(movements))
+
+    def test_batch_rejects_non_integer_product_id(self):
+        self.client.force_login(self.user)
+        movements = [{'product_id': [self.products[0].pk], 'type': 'IN', 'quantity': 1},
+                     {'product_id': True, 'type': 'IN', 'quantity': 1}]
+        response = self.client.post(reverse('api_stock_movements_batch'), json.dumps(movements),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([r['message'] for r in response.json()['results']], ['product_id must be an integer'] * 2)
+
+    def test_budget_exceeded_raises(self):
+        @query_budget(1)
+        def view(request):
+            list(Category.objects.all())
+            list(Supplier.objects.all())
+            return HttpResponse()
+
+        request = self.factory.get('/')
+        request.resolver_match = resolve('/')
+        middleware = QueryBudgetMiddleware(lambda r: middleware.process_view(r, view, (), {}) or view(r))
+        with self.assertRaises(QueryBudgetExceeded):
+            middleware(request)
+
+
+class ProductSaveTests(InventoryTestCase):
+    """Product punya FK dan GeneratedField is_low_stock (Django < 5.0.1: ticket #35019)"""
+
+    def test_new_instance_save(self):
+        product = Product(sku='NEW001', name='Produk baru', category=self.category, supplier=self.supplier,
+                          purchase_price=Decimal('1000'), selling_price=Decimal('1200'),
+                          stock_quantity=2, minimum_stock=5)
+        product.save()
+        self.assertTrue(Product.objects.get(pk=product.pk).is_low_stock)
+
+    def test_admin_stock_edit_is_recorded_in_ledger(self):
+        product = self.products[6]
+        self.client.force_login(User.objects.create_superuser('admin', password='admin12345'))
+        response = self.client.post(reverse('admin:core_product_change', args=[product.pk]), {
+            'sku': product.sku, 'name': 'Nama baru', 'category': self.category.pk, 'supplier': self.supplier.pk,
+            'purchase_price': product.purchase_price, 'selling_price': product.selling_price,
+            'stock_quantity': product.stock_quantity - 4, 'minimum_stock': product.minimum_stock,
+        })
+        self.assertEqual(response.status_code, 302)
+        product.refresh_from_db()
+        self.assertEqual(product.name, 'Nama baru')
+        self.assertEqual(list(product.transactions.values_list('transaction_type', 'quantity')), [('OUT', 4)])
+
+    def test_admin_add(self):
+        self.client.force_login(User.objects.create_superuser('admin', password='admin12345'))
+        response = self.client.post(reverse('admin:core_product_add'), {
+            'sku': 'NEW002', 'name': 'Produk admin', 'category': self.category.pk, 'supplier': self.supplier.pk,
+            'purchase_price': '1000', 'selling_price': '1200', 'stock_quantity': '20', 'minimum_stock': '5',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Product.objects.get(sku='NEW002').is_low_stock)
+
+
+class StockMovementTests(InventoryTestCase):
+    """Ledger StockTransaction harus selalu sama dengan perubahan Product.stock_quantity"""
+
+    def _ledger(self, product):
+        return sum((t.quantity if t.transaction_type == 'IN' else -t.quantity) for t in product.transactions.all())
+
+    def test_out_exceeding_stock_is_rejected(self):
+        product = self.products[0]
+        with self.assertRaises(InsufficientStock):
+            record_stock_movement(product, 'OUT', product.stock_quantity + 6, self.user)
+        self.assertEqual(Product.objects.get(pk=product.pk).stock_quantity, product.stock_quantity + 5)
+        self.assertEqual(product.transactions.count(), 1)
+
+    def test_batch_out_exceeding_stock_is_rejected(self):
+        self.client.force_login(self.user)
+        product = self.products[1]
+        movements = [{'sku': self.products[0].sku, 'type': 'IN', 'quantity': 1},
+                     {'sku': product.sku, 'type': 'OUT', 'quantity': product.stock_quantity + 6}]
+        response = self.client.post(reverse('api_stock_movements_batch'), json.dumps(movements),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([r['status'] for r in response.json()['results']], ['valid', 'error'])
+        self.assertFalse(StockTransaction.objects.filter(quantity=product.stock_quantity + 6).exists())
+
+    def test_large_batch_of_distinct_products(self):
+        products = Product.objects.bulk_create([
+            Product(sku=f'BLK{i:05d}', name=f'Massal {i}', category=self.category, supplier=self.supplier,
+                    purchase_price=Decimal('100'), selling_price=Decimal('150'), stock_quantity=0)
+            for i in range(1500)
+        ])
+        movements = [{'product_id': p.pk, 'transaction_type': 'IN', 'quantity': 2} for p in products]
+        record_stock_movements(movements, self.user)
+        # Batch kedua memperbarui baris rekap yang sudah ada
+        record_stock_movements(movements, self.user)
+        summaries = DailyStockSummary.objects.filter(product__sku__startswith='BLK')
+        self.assertEqual(summaries.count(), 1500)
+        self.assertEqual(set(summaries.values_list('quantity', 'transaction_count')), {(4, 2)})
+        self.assertEqual(set(Product.objects.filter(sku__startswith='BLK').values_list('stock_quantity', flat=True)), {4})
+
+    def test_adjustment_without_user_is_recorded(self):
+        product = self.products[4]
+        set_stock_quantity(product.pk, 2)
+        movement = product.transactions.get()
+        self.assertIsNone(movement.created_by)
+        self.assertEqual(self._ledger(product), 2 - product.stock_quantity)
+        response = self.client.get(reverse('api_product_transaction_history', kwargs={'product_id': product.pk}))
+        self.assertIsNone(response.json()['transactions'][0]['created_by'])
+
+
+class RebuildDailySummaryTests(InventoryTestCase):
+    def _summaries(self):
+        return set(DailyStockSummary.objects.values_list(
+            'date', 'product_id', 'transaction_type', 'quantity', 'transaction_count'))
+
+    def test_rebuild_matches_incremental_rollup(self):
+        record_stock_movement(self.products[0], 'OUT', 2, self.user)
+        expected = self._summaries()
+        DailyStockSummary.objects.update(quantity=0)
+        DailyStockSummary.objects.filter(transaction_type='OUT').delete()
+        call_command('rebuild_daily_stock_summary', stdout=StringIO())
+        self.assertEqual(self._summaries(), expected)
+
+    def test_rebuild_since_keeps_older_rows(self):
+        today = timezone.localdate()
+        older = DailyStockSummary.objects.create(date=today - timedelta(days=3), product=self.products[5],
+                                                 transaction_type='IN', quantity=7, transaction_count=1)
+        call_command('rebuild_daily_stock_summary', since=today.isoformat(), stdout=StringIO())
+        self.assertTrue(DailyStockSummary.objects.filter(pk=older.pk).exists())
+        self.assertEqual(DailyStockSummary.objects.filter(date=today).count(), 4)
+
+
+class GenerateInventoryTests(InventoryTestCase):
+    def _summaries(self, queryset):
+        return set(queryset.values_list('date', 'product_id', 'transaction_type', 'quantity', 'transaction_count'))
+
+    def test_small_dataset_is_consistent_with_ledger(self):
+        call_command('generate_inventory', products=25, transactions=200, days=30, categories=2, suppliers=2,
+                     users=1, chunk_size=10, workers=1, stdout=StringIO())
+        generated = Product.objects.filter(sku__startswith='GEN')
+        self.assertEqual(generated.count(), 25)
+        ledger = {}
+        for product_id, kind, quantity in StockTransaction.objects.filter(product__in=generated).values_list(
+                'product_id', 'transaction_type', 'quantity'):
+            ledger[product_id] = ledger.get(product_id, 0) + (quantity if kind == 'IN' else -quantity)
+        self.assertEqual(ledger, dict(generated.values_list('id', 'stock_quantity')))
+
+        expected = self._summaries(DailyStockSummary.objects.filter(product__in=generated))
+        self.assertEqual(sum(count for *_, count in expected),
+                         StockTransaction.objects.filter(product__in=generated).count())
+        call_command('rebuild_daily_stock_summary', stdout=StringIO())
+        self.assertEqual(self._summaries(DailyStockSummary.objects.filter(product__in=generated)), expected)
+
+    def test_empty_pools_are_rejected(self):
+        for option in ('users', 'categories', 'suppliers'):
+            with self.subTest(option=option), self.assertRaisesMessage(CommandError, 'minimal 1'):
+                call_command('generate_inventory', products=1, workers=1, stdout=StringIO(), **{option: 0})
+
+
+class MetricsTests(InventoryTestCase):
+    def test_route_and_business_metrics_exposed(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse('api_low_stock_products'))
+
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('inventory_http_requests_total{method="GET",route="api_low_stock_products",status="200"}', body)
+        self.assertIn('inventory_db_queries_per_request_count{route="api_low_stock_products"}', body)
+        low_stock = Product.objects.filter(is_low_stock=True).count()
+        self.assertIn(f'inventory_low_stock_products {float(low_stock)}', body)
+
+    @override_settings(METRICS_ALLOWED_IPS=['127.0.0.1', '10.0.0.0/8'], METRICS_TOKEN='rahasia')
+    def test_access_restricted_to_allowlist_or_token(self):
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='10.1.2.3').status_code, 200)
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='203.0.113.5').status_code, 403)
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='203.0.113.5',
+                                         HTTP_AUTHORIZATION='Bearer salah').status_code, 403)
+        self.assertEqual(self.client.get(url, REMOTE_ADDR='203.0.113.5',
+                                         HTTP_AUTHORIZATION='Bearer rahasia').status_code, 200)
+
+
+class ReportExportTests(InventoryTestCase):
+    def test_stock_report_csv_uses_filters(self):
+        other = Category.objects.create(name='Lainnya')
+        Product.objects.create(sku='OTH001', name='Produk Lain', category=other, supplier=self.supplier,
+                               purchase_price=Decimal('500'), selling_price=Decimal('600'), stock_quantity=1)
+        response = self.client.get(reverse('stock_report'), {'export': 'csv', 'category': self.category.pk})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0][:2], ['sku', 'nama'])
+        self.assertEqual(len(rows) - 1, len(self.products))
+        self.assertNotIn('OTH001', [row[0] for row in rows])
+
+    def test_stock_report_links_gzip_export_with_filter(self):
+        response = self.client.get(reverse('stock_report'), {'category': self.category.pk})
+        self.assertContains(response, f'href="?export=csv.gz&category={self.category.pk}"')
+
+    def test_transaction_report_gzip_csv(self):
+        response = self.client.get(reverse('transaction_report'), {'export': 'csv.gz'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        rows = list(csv.reader(gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()))
+        self.assertEqual(len(rows) - 1, StockTransaction.objects.count())
+
+    def test_transaction_csv_local_time_and_formula_escaping(self):
+        movement = record_stock_movement(self.products[5], 'IN', 1, self.user, notes='=HYPERLINK("http://x")')
+        response = self.client.get(reverse('transaction_report'), {'export': 'csv'})
+        rows = list(csv.DictReader(b''.join(response.streaming_content).decode().splitlines()))
+        row = next(r for r in rows if r['id'] == str(movement.pk))
+        self.assertEqual(row['waktu'], timezone.localtime(movement.created_at).strftime('%Y-%m-%d %H:%M:%S'))
+        self.assertEqual(row['catatan'], '\'=HYPERLINK("http://x")')
+
+
+class ProductStreamTests(InventoryTestCase):
+    def _stream(self, fmt):
+        response = self.client.get(reverse('api_all_products'), {'format': fmt})
+        self.assertTrue(response.streaming)
+        # Seluruh katalog (termasuk kategori/supplier) dibaca dengan satu query
+        with self.assertNumQueries(1):
+            body = b''.join(response.streaming_content).decode()
+        return response, body
+
+    def test_ndjson_one_object_per_product(self):
+        response, body = self._stream('ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in body.splitlines()]
+        expected = Product.objects.order_by('name', 'id')
+        self.assertEqual([r['sku'] for r in rows], [p.sku for p in expected])
+        self.assertEqual(rows[0]['category'], {'id': self.category.pk, 'name': self.category.name})
+        self.assertEqual(rows[0]['stock_quantity'], expected[0].stock_quantity)
+
+    def test_json_stream_is_single_document(self):
+        response, body = self._stream('json-stream')
+        self.assertEqual(response['Content-Type'], 'application/json')
+        products = json.loads(body)['products']
+        self.assertEqual(len(products), len(self.products))
+        self.assertEqual({p['supplier']['name'] for p in products}, {self.supplier.name})
+
+
+class HomeCatalogueTests(InventoryTestCase):
+    def _add_products(self, count):
+        Product.objects.bulk_create([
+            Product(sku=f'HOM{i:03d}', name=f'Katalog {i}', category=self.category, supplier=self.supplier,
+                    purchase_price=Decimal('100'), selling_price=Decimal('100') + i, stock_quantity=i)
+            for i in range(count)
+        ])
+
+    def _query_count(self, params):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(reverse('home'), params).status_code, 200)
+        return len(queries)
+
+    def test_page_sorted_by_value_in_database(self):
+        self._add_products(30)
+        response = self.client.get(reverse('home'), {'sort': '-value'})
+        page = list(response.context['products'])
+        self.assertEqual(len(page), HOME_PAGE_SIZE)
+        values = [p.stock_quantity * p.purchase_price for p in Product.objects.all()]
+        self.assertEqual([p.stock_value for p in page], sorted(values, reverse=True)[:HOME_PAGE_SIZE])
+        self.assertEqual(response.context['products'].paginator.count, len(self.products) + 30)
+
+        page = list(self.client.get(reverse('home'), {'sort': 'margin', 'page': 2}).context['products'])
+        self.assertEqual(len(page), len(self.products) + 30 - HOME_PAGE_SIZE)
+        self.assertEqual([p.profit_margin for p in page], sorted(p.profit_margin for p in page))
+
+    def test_query_count_independent_of_catalogue_size(self):
+        params = {'sort': '-value'}
+        before = self._query_count(params)
+        self._add_products(50)
+        self.assertEqual(self._query_count(params), before)
+
+
+class KeysetWindowTests(InventoryTestCase):
+    def test_forward_and_backward_pages(self):
+        ordering = ('-created_at', '-id')
+        expected = list(StockTransaction.objects.order_by(*ordering))
+
+        first, previous_cursor, next_cursor = keyset_window(StockTransaction.objects.all(), ordering, limit=2)
+        self.assertEqual(first, expected[:2])
+        self.assertIsNone(previous_cursor)
+
+        second, previous_cursor, next_cursor = keyset_window(StockTransaction.objects.all(), ordering,
+                                                             after=next_cursor, limit=2)
+        self.assertEqual(second, expected[2:4])
+        self.assertIsNone(next_cursor)
+
+        back, previous_cursor, next_cursor = keyset_window(StockTransaction.objects.all(), ordering,
+                                                           before=previous_cursor, limit=2)
+        self.assertEqual(back, expected[:2])
+        self.assertIsNone(previous_cursor)
+        self.assertIsNotNone(next_cursor)
+
+    def test_transaction_report_tampered_cursor_falls_back_to_first_page(self):
+        first = list(StockTransaction.objects.order_by('-created_at', '-id'))
+        for param in ('after', 'before'):
+            with self.subTest(param):
+                response = self.client.get(reverse('transaction_report'), {param: encode_cursor(['kemarin', 'x'])})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(list(response.context['transactions']), first[:20])
+
+    def test_transaction_report_without_exact_count(self):
+        response = self.client.get(reverse('transaction_report'))
+        self.assertContains(response, 'hitung tepat')
+        response = self.client.get(reverse('transaction_report'), {'exact_count': '1'})
+        self.assertEqual(response.context['total'], StockTransaction.objects.count())
+
+
+class LocalDateRangeTests(InventoryTestCase):
+    def test_bounds_follow_local_day(self):
+        # Asia/Jakarta = UTC+7: 2025-03-01 lokal = [2025-02-28 17:00, 2025-03-01 17:00) UTC
+        late, early = StockTransaction.objects.order_by('id')[:2]
+        StockTransaction.objects.filter(pk=late.pk).update(
+            created_at=datetime(2025, 3, 1, 16, 30, tzinfo=dt_timezone.utc))
+        StockTransaction.objects.filter(pk=early.pk).update(
+            created_at=datetime(2025, 3, 1, 17, 0, tzinfo=dt_timezone.utc))
+
+        day = date(2025, 3, 1)
+        found = filter_local_dates(StockTransaction.objects.all(), 'created_at', day, day)
+        self.assertEqual(list(found.values_list('pk', flat=True)), [late.pk])
+        self.assertEqual(list(found.values_list('pk', flat=True)),
+                         list(StockTransaction.objects.filter(created_at__date=day).values_list('pk', flat=True)))
+
+
+class ReportPaginationTests(InventoryTestCase):
+    def test_low_stock_report_annotates_restock_per_page(self):
+        response = self.client.get(reverse('low_stock_report'))
+        low_stock = Product.objects.filter(is_low_stock=True).order_by('stock_quantity', 'id')
+        self.assertEqual(response.context['total_low_stock'], low_stock.count())
+        page = list(response.context['products'])
+        self.assertEqual([p.pk for p in page], [p.pk for p in low_stock[:len(page)]])
+        self.assertEqual(page[0].restock_quantity, max(0, page[0].minimum_stock - page[0].stock_quantity))
+
+    def test_stock_report_summary_from_aggregate(self):
+        response = self.client.get(reverse('stock_report'))
+        summary = response.context['summary']
+        self.assertEqual(summary['total_items'], len(self.products))
+        self.assertEqual(summary['total_value'], sum(p.stock_quantity * p.purchase_price for p in Product.objects.all()))
+        self.assertEqual(response.context['products'].paginator.count, len(self.products))
+
+
+class ConditionalTests(InventoryTestCase):
+    def test_etag_follows_model_versions(self):
+        url = reverse('api_all_categories')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name='Pakaian')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_stock_movement_only_changes_stock_etags(self):
+        categories, products = reverse('api_all_categories'), reverse('api_all_products')
+        etags = {url: self.client.get(url)['ETag'] for url in (categories, products)}
+        with self.captureOnCommitCallbacks(execute=True):
+            record_stock_movement(self.products[0], 'IN', 1, self.user)
+        self.assertEqual(self.client.get(categories, HTTP_IF_NONE_MATCH=etags[categories]).status_code, 304)
+        self.assertEqual(self.client.get(products, HTTP_IF_NONE_MATCH=etags[products]).status_code, 200)
+
+
+class ImportCacheTests(InventoryTestCase):
+    def test_upsert_invalidates_cached_valuation(self):
+        cached = category_valuation()[0]['total_stock']
+        row = {'sku': 'ELK001', 'name': 'Produk 1', 'category': self.category.name, 'supplier': self.supplier.name,
+               'purchase_price': '1000', 'selling_price': '1100', 'stock_quantity': '500', 'minimum_stock': '10'}
+        with self.captureOnCommitCallbacks(execute=True):
+            upsert_products([row])
+        total = sum(Product.objects.values_list('stock_quantity', flat=True))
+        self.assertNotEqual(total, cached)
+        self.assertEqual(category_valuation()[0]['total_stock'], total)
+
+
+class ImportStockTests(InventoryTestCase):
+    def test_existing_stock_change_recorded_as_adjustment(self):
+        rows = [{'sku': sku, 'name': name, 'category': self.category.name, 'supplier': self.supplier.name,
+                 'purchase_price': '1000', 'selling_price': '1100', 'stock_quantity': stock, 'minimum_stock': '1'}
+                for sku, name, stock in [('ELK008', 'Produk 8', '30'), ('ELK009', 'Produk 9', '27'),
+                                         ('NEW100', 'Produk impor', '9')]]
+        upsert_products(rows)
+        self.assertEqual(dict(Product.objects.filter(sku__in=['ELK008', 'ELK009', 'NEW100'])
+                              .values_list('sku', 'stock_quantity')), {'ELK008': 30, 'ELK009': 27, 'NEW100': 9})
+        # ELK008: 24 -> 30 dicatat; ELK009 tidak berubah; produk baru memakai stok awal dari INSERT
+        self.assertEqual(list(StockTransaction.objects.filter(created_by=None)
+                              .values_list('product__sku', 'transaction_type', 'quantity')), [('ELK008', 'IN', 6)])
+
+
+    def test_invalid_row_rolls_back_whole_import(self):
+        rows = [{'sku': f'NEW{i:03d}', 'name': 'Produk impor', 'category': self.category.name,
+                 'supplier': self.supplier.name, 'purchase_price': '1000', 'selling_price': '1100',
+                 'stock_quantity': '1', 'minimum_stock': '1'} for i in range(3)]
+        rows[2]['category'] = ''
+        with self.assertRaisesMessage(CSVImportError, 'Baris 4'):
+            upsert_products(rows, chunk_size=2)
+        self.assertFalse(Product.objects.filter(sku__startswith='NEW').exists())
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', "COPY hanya tersedia di PostgreSQL")
+class CopyProductsTests(InventoryTestCase):
+    def _csv(self, rows):
+        csvfile = tempfile.NamedTemporaryFile('w', suffix='.csv', newline='', encoding='utf-8', delete=False)
+        self.addCleanup(os.unlink, csvfile.name)
+        with csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(PRODUCT_COLUMNS)
+            for sku, category, stock, price in rows:
+                writer.writerow([sku, f'Nama {sku}', category, self.supplier.name, '1000', price, stock, '1'])
+        return csvfile.name
+
+    def test_duplicates_take_last_row_and_stock_changes_are_adjustments(self):
+        path = self._csv([('NEW200', 'Baru', '4', '1500'), ('ELK008', self.category.name, '30', '9000'),
+                          ('NEW200', 'Baru', '7', '1600')])
+        self.assertEqual(copy_products(path), 2)
+        new = Product.objects.get(sku='NEW200')
+        self.assertEqual((new.stock_quantity, new.selling_price, new.category.name), (7, Decimal('1600'), 'Baru'))
+        self.assertEqual(Product.objects.get(sku='ELK008').stock_quantity, 30)
+        self.assertEqual(list(StockTransaction.objects.filter(created_by=None)
+                              .values_list('product__sku', 'transaction_type', 'quantity')), [('ELK008', 'IN', 6)])
+
+    def test_row_without_category_is_rejected(self):
+        path = self._csv([('NEW201', 'Baru', '4', '1500'), ('NEW202', '', '4', '1500')])
+        with self.assertRaisesMessage(CSVImportError, 'Baris 3'):
+            copy_products(path)
+        self.assertFalse(Product.objects.filter(sku__startswith='NEW').exists())
+
+    def test_unparseable_value_is_command_error(self):
+        path = self._csv([('NEW203', 'Baru', 'banyak', '1500')])
+        with self.assertRaisesMessage(CommandError, 'Products CSV tidak valid'):
+            call_command('import_inventory', products=path, copy=True, categories='/nonexistent',
+                         suppliers='/nonexistent', stdout=StringIO())
+        self.assertFalse(Product.objects.filter(sku='NEW203').exists())
+
+
+class StockAsOfTests(InventoryTestCase):
+    def _stock(self, day):
+        response = self.client.get(reverse('api_stock_as_of'), {'date': day.isoformat(), 'limit': 100})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return data['checkpoint'], {p['id']: p['stock_quantity'] for p in data['products']}
+
+    def test_checkpoint_and_current_stock_agree(self):
+        today = timezone.localdate()
+        yesterday = today - timedelta(days=1)
+        # Transaksi di setUpTestData terjadi hari ini (+5 untuk 4 produk pertama)
+        moved = {p.pk for p in self.products[:4]}
+        expected = {pk: stock - (5 if pk in moved else 0)
+                    for pk, stock in Product.objects.values_list('pk', 'stock_quantity')}
+
+        checkpoint, stock = self._stock(yesterday)
+        self.assertIsNone(checkpoint)
+        self.assertEqual(stock, expected)
+
+        create_checkpoint(yesterday)
+        record_stock_movement(self.products[5], 'OUT', 2, self.user)
+        # Produk baru tanpa baris checkpoint: stok awal di luar ledger, dihitung dari stok saat ini
+        product = Product.objects.create(sku='ELK999', name='Produk baru', category=self.category,
+                                         supplier=self.supplier, purchase_price=Decimal('1000'),
+                                         selling_price=Decimal('1100'), stock_quantity=7, minimum_stock=1)
+        record_stock_movement(product, 'IN', 3, self.user)
+        expected[product.pk] = 7
+        checkpoint, stock = self._stock(yesterday)
+        self.assertEqual(checkpoint, yesterday.isoformat())
+        self.assertEqual(stock, expected)
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', "pg_trgm hanya tersedia di PostgreSQL")
+class TrigramSearchTests(InventoryTestCase):
+    def test_search_matches_substring_and_misspelling(self):
+        coffee = Product.objects.create(sku='KOP001', name='Kopi Arabika Gayo', category=self.category,
+                                        supplier=self.supplier, purchase_price=Decimal('50000'),
+                                        selling_price=Decimal('65000'), stock_quantity=5)
+        url = reverse('api_search_products')
+        for query in ('arabika', 'kop0', 'arabica'):
+            with self.subTest(query=query):
+                products = self.client.get(url, {'q': query}).json()['products']
+                self.assertEqual([p['id'] for p in products], [coffee.pk])
+        ranked = self.client.get(url, {'q': 'ELK001'}).json()['products']
+        self.assertEqual(ranked[0]['sku'], 'ELK001')
+
+
+class CursorValidationTests(InventoryTestCase):
+    def test_tampered_cursor_is_rejected(self):
+        cursor = encode_cursor(['a', 'abc'])
+        for name, kwargs in [('api_all_products', {}), ('api_products_by_category', {'category_id': self.category.pk}),
+                             ('api_products_by_supplier', {'supplier_id': self.supplier.pk}),
+                             ('api_product_transaction_history', {'product_id': self.products[0].pk}),
+                             ('api_stock_as_of', {})]:
+            with self.subTest(name):
+                response = self.client.get(reverse(name, kwargs=kwargs), {'cursor': cursor})
+                self.assertEqual(response.status_code, 400)
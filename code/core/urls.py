@@ -16,6 +16,9 @@ urlpatterns = [
     path('reports/low-stock/', views.low_stock_report_html, name='low_stock_report'),
     path('reports/transactions/', views.transaction_report_html, name='transaction_report'),
     
+    # Metrik Prometheus
+    path('metrics', views.metrics, name='metrics'),
+
     # ============= API JSON ENDPOINTS =============
     # Testing & Helper
     path('api/testing/', views.testing, name='api_testing'),
@@ -40,6 +43,9 @@ urlpatterns = [
     path('api/products/by-category/<int:category_id>/', views.api_products_by_category, name='api_products_by_category'),
     path('api/products/by-supplier/<int:supplier_id>/', views.api_products_by_supplier, name='api_products_by_supplier'),
     path('api/products/search/', views.api_search_products, name='api_search_products'),
+
+    # Stock Movements API
+    path('api/stock-movements/batch/', views.api_stock_movements_batch, name='api_stock_movements_batch'),
     
     # Statistics & Reports API
     path('api/stats/inventory/', views.api_inventory_stats, name='api_inventory_stats'),
@@ -47,4 +53,5 @@ urlpatterns = [
     path('api/stats/stock-value/', views.api_stock_value_report, name='api_stock_value_report'),
     path('api/stats/transactions/', views.api_transaction_stats, name='api_transaction_stats'),
     path('api/stats/product/<int:product_id>/transactions/', views.api_product_transaction_history, name='api_product_transaction_history'),
+    path('api/stats/stock-as-of/', views.api_stock_as_of, name='api_stock_as_of'),
 ]
\ No newline at end of file
@@ -1,10 +1,28 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db.models import Q, F, Sum, Count, Avg, Max, Min
-from django.http import JsonResponse
+from django.core.exceptions import PermissionDenied
+from django.db.models import Q, F, Sum, Count, Avg, Max, Min, Case, When, Value, DecimalField, FloatField, ExpressionWrapper
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import render, get_object_or_404
 from django.core.paginator import Paginator
+from django.db.models.functions import Greatest
+from datetime import date
 from decimal import Decimal
-from .models import Product, Category, Supplier, StockTransaction
+import json
+from .models import Product, Category, Supplier, StockTransaction, DailyStockSummary
+from .cache import category_valuation, supplier_valuation
+from .checkpoints import stock_as_of
+from .budgets import query_budget
+from .concurrency import gather_queries
+from .conditional import conditional_on
+from .dates import filter_local_dates
+from .forms import DateRangeForm
+from .metrics import metrics_allowed, render_metrics
+from .pagination import CountedPaginator, InvalidCursor, estimate_count, keyset_page, keyset_window, parse_limit
+from .search import MAX_SEARCH_LIMIT, SEARCH_LIMIT, filter_products, search_products
+from .services import MAX_BATCH_SIZE, InsufficientStock, record_stock_movements, set_stock_quantity
+from .streaming import stream_csv, stream_queryset
 
 
 # ============= UTILITIES =============
@@ -12,31 +30,95 @@ from .models import Product, Category, Supplier, StockTransaction
 def _profit_margin(purchase_price, selling_price):
     return float(((selling_price - purchase_price) / purchase_price) * 100) if purchase_price > 0 else 0.0
 
-def _is_low_stock(product):
-    return product.stock_quantity <= product.minimum_stock
-
 def _stock_value(product):
     return product.stock_quantity * product.purchase_price
 
+STOCK_VALUE = ExpressionWrapper(F('stock_quantity') * F('purchase_price'), output_field=DecimalField(max_digits=20, decimal_places=2))
+RESTOCK_QUANTITY = Greatest(F('minimum_stock') - F('stock_quantity'), Value(0))
+PROFIT_MARGIN = ExpressionWrapper(
+    (F('selling_price') - F('purchase_price')) * 100 / F('purchase_price'), output_field=FloatField()
+)
+
+def _with_stock_value(qs):
+    return qs.annotate(stock_value=STOCK_VALUE)
+
+def _with_profit_margin(qs):
+    """Margin dihitung di SQL; purchase_price 0 dianggap margin 0 seperti _profit_margin"""
+    return qs.annotate(profit_margin=Case(When(purchase_price__gt=0, then=PROFIT_MARGIN), default=Value(0.0), output_field=FloatField()))
+
 def _annotate_counts(qs, rel='products'):
     return qs.annotate(product_count=Count(rel)).order_by('name')
 
+def _movement_totals(summaries):
+    """Total stok masuk/keluar & jumlah transaksi dari DailyStockSummary dalam satu query"""
+    totals = summaries.aggregate(
+        total_in=Sum('quantity', filter=Q(transaction_type='IN')),
+        total_out=Sum('quantity', filter=Q(transaction_type='OUT')),
+        total_transactions=Sum('transaction_count'),
+    )
+    return {k: v or 0 for k, v in totals.items()}
+
+def _keyset_page(request, qs, ordering):
+    """Keyset pagination dari ?cursor=&limit=; raise InvalidCursor jika parameter salah"""
+    return keyset_page(qs, ordering, cursor=request.GET.get('cursor'), limit=parse_limit(request.GET.get('limit')))
+
+PRODUCT_ORDERING = ('name', 'id')
+TRANSACTION_ORDERING = ('-created_at', '-id')
+STREAM_FORMATS = ('ndjson', 'json-stream')
+EXPORT_FORMATS = ('csv', 'csv.gz')
+
+
+# Kolom export CSV laporan: (header, field/annotation untuk values_list)
+STOCK_REPORT_COLUMNS = (
+    ('sku', 'sku'), ('nama', 'name'), ('kategori', 'category__name'), ('supplier', 'supplier__name'),
+    ('stok', 'stock_quantity'), ('stok_minimum', 'minimum_stock'), ('harga_beli', 'purchase_price'),
+    ('harga_jual', 'selling_price'), ('nilai_stok', 'stock_value'),
+)
+LOW_STOCK_REPORT_COLUMNS = (
+    ('sku', 'sku'), ('nama', 'name'), ('kategori', 'category__name'), ('supplier', 'supplier__name'),
+    ('stok', 'stock_quantity'), ('stok_minimum', 'minimum_stock'), ('jumlah_restock', 'restock_quantity'),
+)
+TRANSACTION_REPORT_COLUMNS = (
+    ('id', 'id'), ('waktu', 'created_at'), ('sku', 'product__sku'), ('produk', 'product__name'),
+    ('kategori', 'product__category__name'), ('tipe', 'transaction_type'), ('jumlah', 'quantity'),
+    ('dibuat_oleh', 'created_by__username'), ('catatan', 'notes'),
+)
+
 
 # ============= HTML VIEWS =============
 
+HOME_PAGE_SIZE = 24
+HOME_SORT_OPTIONS = {
+    'name': ('name', 'id'),
+    '-name': ('-name', '-id'),
+    'stock': ('stock_quantity', 'id'),
+    '-stock': ('-stock_quantity', 'id'),
+    'value': ('stock_value', 'id'),
+    '-value': ('-stock_value', 'id'),
+    'margin': ('profit_margin', 'id'),
+    '-margin': ('-profit_margin', 'id'),
+}
+HOME_PRODUCT_FIELDS = (
+    'id', 'sku', 'name', 'purchase_price', 'selling_price', 'stock_quantity', 'minimum_stock', 'is_low_stock',
+    'category__name', 'supplier__name',
+)
+
+
+@query_budget(5)
 def home(request):
-    """Homepage dengan katalog produk (HTML)"""
-    stats = {
-        'total_products': Product.objects.count(),
-        'total_stock_value': Product.objects.aggregate(total=Sum(F('stock_quantity') * F('purchase_price')))['total'] or 0,
-        'low_stock_count': Product.objects.filter(stock_quantity__lte=F('minimum_stock')).count(),
-    }
+    """Homepage dengan katalog produk (HTML), dipaginasi dan diurutkan di database"""
+    stats = Product.objects.aggregate(
+        total_products=Count('id'),
+        total_stock_value=Sum(STOCK_VALUE),
+        low_stock_count=Count('id', filter=Q(is_low_stock=True)),
+    )
+    stats['total_stock_value'] = stats['total_stock_value'] or 0
 
-    products = Product.objects.select_related('category', 'supplier')
+    products = Product.objects.select_related('category', 'supplier').only(*HOME_PRODUCT_FIELDS)
 
     search = request.GET.get('search')
     if search:
-        products = products.filter(Q(name__icontains=search) | Q(sku__icontains=search))
+        products = filter_products(products, search)
 
     if (category_id := request.GET.get('category')):
         products = products.filter(category_id=category_id)
@@ -45,33 +127,38 @@ def home(request):
         products = products.filter(supplier_id=supplier_id)
 
     if request.GET.get('low_stock') == 'true':
-        products = products.filter(stock_quantity__lte=F('minimum_stock'))
+        products = products.filter(is_low_stock=True)
 
-    products = products.order_by('name')
+    sort = request.GET.get('sort', 'name')
+    if sort not in HOME_SORT_OPTIONS:
+        sort = 'name'
+    products = _with_profit_margin(_with_stock_value(products)).order_by(*HOME_SORT_OPTIONS[sort])
 
-    categories = _annotate_counts(Category.objects.all())
-    suppliers = _annotate_counts(Supplier.objects.all())
+    page_obj = Paginator(products, HOME_PAGE_SIZE).get_page(request.GET.get('page'))
 
-    products_with_calcs = []
-    for p in products:
-        p.is_low_stock = _is_low_stock(p)
-        p.stock_value = _stock_value(p)
-        p.profit_margin = _profit_margin(p.purchase_price, p.selling_price)
-        products_with_calcs.append(p)
+    # Daftar filter memakai agregat valuasi yang sudah di-cache
+    categories = sorted(category_valuation(), key=lambda c: c['name'])
+    suppliers = sorted(supplier_valuation(), key=lambda s: s['name'])
+
+    querystring = request.GET.copy()
+    querystring.pop('page', None)
 
     context = {
         'stats': stats,
-        'products': products_with_calcs,
+        'products': page_obj,
         'categories': categories,
         'suppliers': suppliers,
         'search': search or '',
         'selected_category': request.GET.get('category', ''),
         'selected_supplier': request.GET.get('supplier', ''),
         'low_stock_filter': request.GET.get('low_stock', ''),
+        'sort': sort,
+        'querystring': querystring.urlencode(),
     }
     return render(request, 'inventory/home.html', context)
 
 
+@query_budget(2)
 def product_detail_html(request, pk):
     """Detail produk dengan riwayat transaksi (HTML)"""
     product = get_object_or_404(Product.objects.select_related('category', 'supplier'), pk=pk)
@@ -79,7 +166,6 @@ def product_detail_html(request, pk):
     product.stock_value = _stock_value(product)
     product.total_stock_value = product.stock_value
     product.profit_margin = _profit_margin(product.purchase_price, product.selling_price)
-    product.is_low_stock = _is_low_stock(product)
     product.sell_price = product.selling_price  # alias untuk template
 
     transactions = (StockTransaction.objects
@@ -90,70 +176,109 @@ def product_detail_html(request, pk):
     return render(request, 'inventory/product_detail.html', {'product': product, 'transactions': transactions})
 
 
+STOCK_REPORT_PAGE_SIZE = 50
+LOW_STOCK_REPORT_PAGE_SIZE = 20
+
+
+@query_budget(3)
 def stock_report_html(request):
-    """Laporan stok produk (HTML)"""
+    """Laporan stok produk (HTML, atau CSV dengan ?export=csv / csv.gz)"""
     products = Product.objects.select_related('category', 'supplier')
     if (category_id := request.GET.get('category')):
         products = products.filter(category_id=category_id)
 
-    products_with_calcs = []
-    for p in products:
-        p.stock_value = _stock_value(p)
-        products_with_calcs.append(p)
+    if (export := request.GET.get('export')) in EXPORT_FORMATS:
+        return stream_csv(_with_stock_value(products).order_by('name', 'id'), STOCK_REPORT_COLUMNS,
+                          'laporan-stok.csv', compress=export == 'csv.gz')
 
-    summary = {
-        'total_items': len(products_with_calcs),
-        'total_value': sum(p.stock_value for p in products_with_calcs)
-    }
+    # Satu aggregate untuk ringkasan (juga jumlah baris paginator), lalu hanya satu halaman yang dibaca
+    summary = products.aggregate(total_items=Count('id'), total_value=Sum(STOCK_VALUE))
+    summary['total_value'] = summary['total_value'] or 0
+    paginator = CountedPaginator(_with_stock_value(products).order_by('name', 'id'), STOCK_REPORT_PAGE_SIZE,
+                                 count=summary['total_items'])
+    page_obj = paginator.get_page(request.GET.get('page'))
 
     categories = _annotate_counts(Category.objects.all())
+    querystring = request.GET.copy()
+    querystring.pop('page', None)
     context = {
-        'products': products_with_calcs,
+        'products': page_obj,
         'summary': summary,
         'categories': categories,
         'selected_category': request.GET.get('category'),
+        'querystring': querystring.urlencode(),
     }
     return render(request, 'inventory/reports/stock_report.html', context)
 
 
-def transaction_report_html(request):
-    """Laporan transaksi stok (HTML)"""
-    transactions = StockTransaction.objects.select_related('product', 'product__category', 'created_by').order_by('-created_at')
+TRANSACTION_REPORT_PAGE_SIZE = 20
 
-    start_date, end_date = request.GET.get('start_date', ''), request.GET.get('end_date', '')
-    if start_date and end_date:
-        transactions = transactions.filter(created_at__date__range=[start_date, end_date])
-    elif start_date:
-        transactions = transactions.filter(created_at__date__gte=start_date)
-    elif end_date:
-        transactions = transactions.filter(created_at__date__lte=end_date)
 
-    summary = transactions.aggregate(
-        total_in=Sum('quantity', filter=Q(transaction_type='IN')),
-        total_out=Sum('quantity', filter=Q(transaction_type='OUT')),
-        total_transactions=Count('id')
-    )
-    for k in ('total_in', 'total_out', 'total_transactions'):
-        summary[k] = summary[k] or 0
+@query_budget(3)
+def transaction_report_html(request):
+    """Laporan transaksi stok (HTML, atau CSV dengan ?export=csv / csv.gz)"""
+    transactions = StockTransaction.objects.select_related('product', 'product__category', 'created_by').order_by('-created_at')
 
-    page_obj = Paginator(transactions, 20).get_page(request.GET.get('page'))
-    context = {'transactions': page_obj, 'summary': summary, 'start_date': start_date, 'end_date': end_date}
+    # Tanggal tidak valid diabaikan; rentang tanggal lokal -> batas UTC yang bisa memakai index created_at
+    form = DateRangeForm(request.GET)
+    form.is_valid()
+    start_date, end_date = form.cleaned_data.get('start_date'), form.cleaned_data.get('end_date')
+    transactions = filter_local_dates(transactions, 'created_at', start_date, end_date)
+
+    if (export := request.GET.get('export')) in EXPORT_FORMATS:
+        return stream_csv(transactions.order_by('-created_at', '-id'), TRANSACTION_REPORT_COLUMNS,
+                          'laporan-transaksi.csv', compress=export == 'csv.gz')
+
+    # Ringkasan dari rekap harian (tanggal lokal sama dengan filter di atas), bukan memindai ledger
+    summaries = DailyStockSummary.objects.all()
+    if start_date:
+        summaries = summaries.filter(date__gte=start_date)
+    if end_date:
+        summaries = summaries.filter(date__lte=end_date)
+    summary = _movement_totals(summaries)
+
+    # Keyset pagination tanpa COUNT(*); total hanya perkiraan planner kecuali ?exact_count=1
+    try:
+        rows, previous_cursor, next_cursor = keyset_window(
+            transactions, TRANSACTION_ORDERING, after=request.GET.get('after'), before=request.GET.get('before'),
+            limit=TRANSACTION_REPORT_PAGE_SIZE)
+    except InvalidCursor:
+        rows, previous_cursor, next_cursor = keyset_window(transactions, TRANSACTION_ORDERING, limit=TRANSACTION_REPORT_PAGE_SIZE)
+    exact_count = request.GET.get('exact_count') == '1'
+    total = transactions.count() if exact_count else estimate_count(transactions)
+
+    filters = request.GET.copy()
+    for key in ('after', 'before', 'exact_count', 'export'):
+        filters.pop(key, None)
+    context = {
+        'transactions': rows,
+        'previous_cursor': previous_cursor,
+        'next_cursor': next_cursor,
+        'total': total,
+        'exact_count': exact_count,
+        'querystring': filters.urlencode(),
+        'summary': summary,
+        'start_date': start_date.isoformat() if start_date else '',
+        'end_date': end_date.isoformat() if end_date else '',
+    }
     return render(request, 'inventory/reports/transaction_report.html', context)
 
 
+@query_budget(2)
 def low_stock_report_html(request):
-    """Laporan produk stok rendah (HTML)"""
+    """Laporan produk stok rendah (HTML, atau CSV dengan ?export=csv / csv.gz)"""
     products = (Product.objects.select_related('category', 'supplier')
-                .filter(stock_quantity__lte=F('minimum_stock'))
+                .filter(is_low_stock=True)
                 .order_by('stock_quantity'))
 
-    products_with_restock = []
-    for p in products:
-        p.restock_quantity = max(0, p.minimum_stock - p.stock_quantity)
-        products_with_restock.append(p)
+    if (export := request.GET.get('export')) in EXPORT_FORMATS:
+        restock = products.annotate(restock_quantity=RESTOCK_QUANTITY).order_by('stock_quantity', 'id')
+        return stream_csv(restock, LOW_STOCK_REPORT_COLUMNS, 'laporan-stok-rendah.csv', compress=export == 'csv.gz')
 
-    page_obj = Paginator(products_with_restock, 20).get_page(request.GET.get('page'))
-    context = {'products': page_obj, 'total_low_stock': products.count()}
+    total_low_stock = products.aggregate(total=Count('id'))['total']
+    paginator = CountedPaginator(products.annotate(restock_quantity=RESTOCK_QUANTITY).order_by('stock_quantity', 'id'),
+                                 LOW_STOCK_REPORT_PAGE_SIZE, count=total_low_stock)
+    context = {'products': paginator.get_page(request.GET.get('page')), 'total_low_stock': total_low_stock}
     return render(request, 'inventory/reports/low_stock_report.html', context)
 
 
@@ -183,6 +308,8 @@ def create_test_product(request):
 
 # ============= CRUD OPERATIONS - CATEGORY (API) =============
 
+@query_budget(2)
+@conditional_on(Category, Product)
 def api_all_categories(request):
     """Get all categories (JSON)"""
     categories = _annotate_counts(Category.objects.all())
@@ -190,6 +317,7 @@ def api_all_categories(request):
     return JsonResponse({'categories': data}, safe=False)
 
 
+@query_budget(2)
 def api_category_detail(request, category_id):
     """Get category detail with products (JSON)"""
     try:
@@ -217,6 +345,8 @@ def api_delete_category(request, category_id):
 
 # ============= CRUD OPERATIONS - SUPPLIER (API) =============
 
+@query_budget(2)
+@conditional_on(Supplier, Product)
 def api_all_suppliers(request):
     """Get all suppliers (JSON)"""
     suppliers = _annotate_counts(Supplier.objects.all())
@@ -224,6 +354,7 @@ def api_all_suppliers(request):
     return JsonResponse({'suppliers': data}, safe=False)
 
 
+@query_budget(2)
 def api_supplier_detail(request, supplier_id):
     """Get supplier detail with products (JSON)"""
     try:
@@ -258,10 +389,8 @@ def api_delete_supplier(request, supplier_id):
 
 # ============= CRUD OPERATIONS - PRODUCT (API) =============
 
-def api_all_products(request):
-    """Get all products (JSON)"""
-    products = Product.objects.select_related('category', 'supplier')
-    data = [{
+def _product_dict(p):
+    return {
         'id': p.id,
         'sku': p.sku,
         'name': p.name,
@@ -271,10 +400,30 @@ def api_all_products(request):
         'selling_price': float(p.selling_price),
         'stock_quantity': p.stock_quantity,
         'minimum_stock': p.minimum_stock,
-    } for p in products]
-    return JsonResponse({'products': data}, safe=False)
+    }
+
+
+@query_budget(2)
+@conditional_on(Product, StockTransaction, Category, Supplier)
+def api_all_products(request):
+    """
+    Get all products (JSON), keyset-paginated with ?cursor=&limit=.
+    ?format=ndjson atau ?format=json-stream men-stream seluruh katalog.
+    """
+    products = Product.objects.select_related('category', 'supplier')
+    fmt = request.GET.get('format')
+    if fmt in STREAM_FORMATS:
+        return stream_queryset(products.order_by(*PRODUCT_ORDERING), _product_dict, fmt=fmt, key='products')
+
+    try:
+        products, next_cursor = _keyset_page(request, products, PRODUCT_ORDERING)
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    data = [_product_dict(p) for p in products]
+    return JsonResponse({'products': data, 'next_cursor': next_cursor}, safe=False)
 
 
+@query_budget(2)
 def api_product_detail(request, product_id):
     """Get product detail with recent transactions (JSON)"""
     try:
@@ -288,7 +437,7 @@ def api_product_detail(request, product_id):
             'type_display': t.get_transaction_type_display(),
             'quantity': t.quantity,
             'notes': t.notes,
-            'created_by': t.created_by.username,
+            'created_by': t.created_by.username if t.created_by_id else None,
             'created_at': t.created_at.isoformat()
         } for t in transactions]
 
@@ -305,7 +454,7 @@ def api_product_detail(request, product_id):
             'metrics': {
                 'stock_value': float(_stock_value(p)),
                 'profit_margin': _profit_margin(p.purchase_price, p.selling_price),
-                'is_low_stock': _is_low_stock(p)
+                'is_low_stock': p.is_low_stock
             },
             'recent_transactions': transaction_list
         }
@@ -314,34 +463,45 @@ def api_product_detail(request, product_id):
         return JsonResponse({'error': 'Product not found'}, status=404)
 
 
+@query_budget(1)
 def api_products_by_category(request, category_id):
-    """Get all products in a category (JSON)"""
-    products = Product.objects.filter(category_id=category_id).select_related('supplier')
+    """Get products in a category, keyset-paginated (JSON)"""
+    try:
+        products, next_cursor = _keyset_page(request, Product.objects.filter(category_id=category_id).select_related('supplier'), PRODUCT_ORDERING)
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
     data = [{
         'id': p.id, 'sku': p.sku, 'name': p.name, 'supplier': p.supplier.name,
         'stock_quantity': p.stock_quantity, 'purchase_price': float(p.purchase_price),
         'selling_price': float(p.selling_price)
     } for p in products]
-    return JsonResponse({'category_id': category_id, 'product_count': len(data), 'products': data}, safe=False)
+    return JsonResponse({'category_id': category_id, 'product_count': len(data), 'products': data, 'next_cursor': next_cursor}, safe=False)
 
 
+@query_budget(1)
 def api_products_by_supplier(request, supplier_id):
-    """Get all products from a supplier (JSON)"""
-    products = Product.objects.filter(supplier_id=supplier_id).select_related('category')
+    """Get products from a supplier, keyset-paginated (JSON)"""
+    try:
+        products, next_cursor = _keyset_page(request, Product.objects.filter(supplier_id=supplier_id).select_related('category'), PRODUCT_ORDERING)
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
     data = [{
         'id': p.id, 'sku': p.sku, 'name': p.name, 'category': p.category.name,
         'stock_quantity': p.stock_quantity, 'purchase_price': float(p.purchase_price),
         'selling_price': float(p.selling_price)
     } for p in products]
-    return JsonResponse({'supplier_id': supplier_id, 'product_count': len(data), 'products': data}, safe=False)
+    return JsonResponse({'supplier_id': supplier_id, 'product_count': len(data), 'products': data, 'next_cursor': next_cursor}, safe=False)
 
 
 def api_update_product_stock(request, product_id):
     """Update product stock quantity (JSON)"""
     try:
-        product = Product.objects.get(pk=product_id)
-        product.stock_quantity = int(request.POST.get("stock_quantity", product.stock_quantity))
-        product.save()
+        if "stock_quantity" not in request.POST:
+            product = Product.objects.only('id', 'sku', 'stock_quantity').get(pk=product_id)
+        else:
+            user = request.user if request.user.is_authenticated else None
+            product = set_stock_quantity(product_id, int(request.POST["stock_quantity"]), user=user,
+                                         notes="Penyesuaian stok via API")
         return JsonResponse({"status": "success", "product_id": product.id, "sku": product.sku, "new_stock": product.stock_quantity})
     except Product.DoesNotExist:
         return JsonResponse({"status": "error", "message": "Product not found"}, status=404)
@@ -349,6 +509,82 @@ def api_update_product_stock(request, product_id):
         return JsonResponse({"status": "error", "message": str(e)}, status=400)
 
 
+def _parse_movement(line, products_by_sku, products_by_id):
+    """Validasi satu baris batch; mengembalikan (movement, error)"""
+    if not isinstance(line, dict):
+        return None, "Each movement must be an object"
+    if line.get('sku'):
+        product = products_by_sku.get(str(line['sku']))
+    elif line.get('product_id') is not None:
+        product_id = line['product_id']
+        if not isinstance(product_id, int) or isinstance(product_id, bool):
+            return None, "product_id must be an integer"
+        product = products_by_id.get(product_id)
+    else:
+        return None, "Either 'sku' or 'product_id' is required"
+    if product is None:
+        return None, "Product not found"
+    transaction_type = line.get('type')
+    if transaction_type not in ('IN', 'OUT'):
+        return None, "type must be 'IN' or 'OUT'"
+    quantity = line.get('quantity')
+    if not isinstance(quantity, int) or isinstance(quantity, bool) or quantity < 1:
+        return None, "quantity must be a positive integer"
+    return {'product_id': product[0], 'sku': product[1], 'transaction_type': transaction_type,
+            'quantity': quantity, 'notes': str(line.get('notes') or '')}, None
+
+
+@query_budget(15)
+def api_stock_movements_batch(request):
+    """
+    Record many stock movements at once (JSON).
+    Body: [{"sku" | "product_id", "type": "IN"|"OUT", "quantity", "notes"}, ...]
+    The whole array is validated first; nothing is written if any line is invalid.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"status": "error", "message": "POST required"}, status=405)
+    if not request.user.is_authenticated:
+        return JsonResponse({"status": "error", "message": "Authentication required"}, status=401)
+    try:
+        lines = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"status": "error", "message": "Invalid JSON"}, status=400)
+    if not isinstance(lines, list) or not lines:
+        return JsonResponse({"status": "error", "message": "Body must be a non-empty JSON array"}, status=400)
+    if len(lines) > MAX_BATCH_SIZE:
+        return JsonResponse({"status": "error", "message": f"At most {MAX_BATCH_SIZE} movements per batch"}, status=400)
+
+    # Resolusi semua SKU/ID dalam satu query
+    skus = {str(l['sku']) for l in lines if isinstance(l, dict) and l.get('sku')}
+    ids = {l['product_id'] for l in lines if isinstance(l, dict) and not l.get('sku')
+           and isinstance(l.get('product_id'), int) and not isinstance(l.get('product_id'), bool)}
+    found = Product.objects.filter(Q(sku__in=skus) | Q(pk__in=ids)).values_list('id', 'sku')
+    products_by_sku = {sku: (pk, sku) for pk, sku in found}
+    products_by_id = {pk: (pk, sku) for pk, sku in products_by_sku.values()}
+
+    movements, results = [], []
+    for index, line in enumerate(lines):
+        movement, error = _parse_movement(line, products_by_sku, products_by_id)
+        movements.append(movement)
+        results.append({'line': index, 'status': 'error' if error else 'valid', **({'message': error} if error else {})})
+    if any(r['status'] == 'error' for r in results):
+        return JsonResponse({"status": "error", "message": "Batch rejected; no movements recorded", "results": results}, status=400)
+
+    try:
+        created = record_stock_movements(movements, request.user)
+    except InsufficientStock as e:
+        # Dicek terhadap selisih bersih per produk saat baris produk terkunci
+        for result, movement in zip(results, movements):
+            if movement['product_id'] == e.product_id:
+                result.update(status='error', message=str(e))
+        return JsonResponse({"status": "error", "message": "Batch rejected; no movements recorded", "results": results}, status=400)
+    return JsonResponse({"status": "success", "recorded": len(created), "results": [
+        {'line': index, 'status': 'recorded', 'transaction_id': tx.id, 'product_id': m['product_id'],
+         'sku': m['sku'], 'type': m['transaction_type'], 'quantity': m['quantity']}
+        for index, (m, tx) in enumerate(zip(movements, created))
+    ]})
+
+
 def api_delete_product(request, product_id):
     """Delete a product (JSON)"""
     try:
@@ -371,31 +607,40 @@ def api_delete_all_products(request):
 
 # ============= STATISTICS & REPORTS (API) =============
 
-def api_inventory_stats(request):
-    """Get overall inventory statistics (JSON)"""
-    products = Product.objects.select_related('category', 'supplier')
-    total_products = products.count()
-    low_stock_count = products.filter(stock_quantity__lte=F('minimum_stock')).count()
-
-    stats = products.aggregate(
-        total_stock_value=Sum(F('stock_quantity') * F('purchase_price')),
-        avg_purchase_price=Avg('purchase_price'),
-        avg_selling_price=Avg('selling_price'),
-        max_stock=Max('stock_quantity'),
-        min_stock=Min('stock_quantity'),
-        total_items_in_stock=Sum('stock_quantity')
+@query_budget(8)
+@conditional_on(Product, StockTransaction, Category, Supplier)
+async def api_inventory_stats(request):
+    """Get overall inventory statistics (JSON); independent queries run concurrently"""
+    products = Product.objects.only('id', 'name', 'selling_price', 'stock_quantity')
+    results = await gather_queries(
+        stats=lambda: Product.objects.aggregate(
+            total_products=Count('id'),
+            low_stock_count=Count('id', filter=Q(is_low_stock=True)),
+            total_stock_value=Sum(F('stock_quantity') * F('purchase_price')),
+            avg_purchase_price=Avg('purchase_price'),
+            avg_selling_price=Avg('selling_price'),
+            max_stock=Max('stock_quantity'),
+            min_stock=Min('stock_quantity'),
+            total_items_in_stock=Sum('stock_quantity'),
+        ),
+        most_expensive=lambda: products.order_by('-selling_price').first(),
+        cheapest=lambda: products.order_by('selling_price').first(),
+        highest_stock=lambda: products.order_by('-stock_quantity').first(),
+        lowest_stock=lambda: products.order_by('stock_quantity').first(),
+        categories=category_valuation,
+        suppliers=supplier_valuation,
     )
+    stats = results['stats']
+    total_products = stats['total_products']
+    low_stock_count = stats['low_stock_count']
+    most_expensive, cheapest = results['most_expensive'], results['cheapest']
+    highest_stock, lowest_stock = results['highest_stock'], results['lowest_stock']
 
-    most_expensive = products.order_by('-selling_price').first()
-    cheapest = products.order_by('selling_price').first()
-    highest_stock = products.order_by('-stock_quantity').first()
-    lowest_stock = products.order_by('stock_quantity').first()
+    top_cats = sorted(results['categories'], key=lambda c: c['product_count'], reverse=True)[:5]
+    top_sups = sorted(results['suppliers'], key=lambda s: s['product_count'], reverse=True)[:5]
 
-    top_cats = Category.objects.annotate(product_count=Count('products'), total_stock=Sum('products__stock_quantity')).order_by('-product_count')[:5]
-    top_sups = Supplier.objects.annotate(product_count=Count('products'), total_stock=Sum('products__stock_quantity')).order_by('-product_count')[:5]
-
-    category_data = [{'name': c.name, 'product_count': c.product_count, 'total_stock': c.total_stock or 0} for c in top_cats]
-    supplier_data = [{'name': s.name, 'product_count': s.product_count, 'total_stock': s.total_stock or 0} for s in top_sups]
+    category_data = [{'name': c['name'], 'product_count': c['product_count'], 'total_stock': c['total_stock'] or 0} for c in top_cats]
+    supplier_data = [{'name': s['name'], 'product_count': s['product_count'], 'total_stock': s['total_stock'] or 0} for s in top_sups]
 
     result = {
         'overview': {
@@ -427,9 +672,10 @@ def api_inventory_stats(request):
     return JsonResponse(result, safe=False)
 
 
+@query_budget(1)
 def api_low_stock_products(request):
     """Get products with low stock (JSON)"""
-    products = (Product.objects.filter(stock_quantity__lte=F('minimum_stock'))
+    products = (Product.objects.filter(is_low_stock=True)
                 .select_related('category', 'supplier').order_by('stock_quantity'))
     data = [{
         'id': p.id, 'sku': p.sku, 'name': p.name, 'category': p.category.name, 'supplier': p.supplier.name,
@@ -438,35 +684,20 @@ def api_low_stock_products(request):
     return JsonResponse({'low_stock_count': len(data), 'products': data}, safe=False)
 
 
+@query_budget(2)
 def api_stock_value_report(request):
     """Report of stock value by category and supplier (JSON)"""
-    cat_values = Category.objects.annotate(
-        product_count=Count('products'),
-        total_stock=Sum('products__stock_quantity'),
-        total_value=Sum(F('products__stock_quantity') * F('products__purchase_price'))
-    ).order_by('-total_value')
-
-    sup_values = Supplier.objects.annotate(
-        product_count=Count('products'),
-        total_stock=Sum('products__stock_quantity'),
-        total_value=Sum(F('products__stock_quantity') * F('products__purchase_price'))
-    ).order_by('-total_value')
-
-    by_category = [{'name': c.name, 'product_count': c.product_count, 'total_stock': c.total_stock or 0, 'total_value': float(c.total_value or 0)} for c in cat_values]
-    by_supplier = [{'name': s.name, 'product_count': s.product_count, 'total_stock': s.total_stock or 0, 'total_value': float(s.total_value or 0)} for s in sup_values]
+    by_category = [{'name': c['name'], 'product_count': c['product_count'], 'total_stock': c['total_stock'] or 0, 'total_value': float(c['total_value'] or 0)} for c in category_valuation()]
+    by_supplier = [{'name': s['name'], 'product_count': s['product_count'], 'total_stock': s['total_stock'] or 0, 'total_value': float(s['total_value'] or 0)} for s in supplier_valuation()]
 
     return JsonResponse({'by_category': by_category, 'by_supplier': by_supplier}, safe=False)
 
 
+@query_budget(3)
 def api_transaction_stats(request):
     """Get transaction statistics (JSON)"""
     transactions = StockTransaction.objects.select_related('product', 'created_by')
-
-    stats = transactions.aggregate(
-        total_transactions=Count('id'),
-        total_in=Sum('quantity', filter=Q(transaction_type='IN')),
-        total_out=Sum('quantity', filter=Q(transaction_type='OUT')),
-    )
+    stats = _movement_totals(DailyStockSummary.objects.all())
 
     recent = transactions.order_by('-created_at')[:20]
     recent_list = [{
@@ -476,7 +707,7 @@ def api_transaction_stats(request):
         'type_display': t.get_transaction_type_display(),
         'quantity': t.quantity,
         'notes': t.notes,
-        'created_by': t.created_by.username,
+        'created_by': t.created_by.username if t.created_by_id else None,
         'created_at': t.created_at.isoformat()
     } for t in recent]
 
@@ -487,9 +718,9 @@ def api_transaction_stats(request):
     result = {
         'overview': {
             'total_transactions': stats['total_transactions'],
-            'total_in': stats['total_in'] or 0,
-            'total_out': stats['total_out'] or 0,
-            'net_movement': (stats['total_in'] or 0) - (stats['total_out'] or 0)
+            'total_in': stats['total_in'],
+            'total_out': stats['total_out'],
+            'net_movement': stats['total_in'] - stats['total_out']
         },
         'recent_transactions': recent_list,
         'top_users': top_users
@@ -497,11 +728,13 @@ def api_transaction_stats(request):
     return JsonResponse(result, safe=False)
 
 
+@query_budget(3)
 def api_product_transaction_history(request, product_id):
-    """Get transaction history for a specific product (JSON)"""
+    """Get transaction history for a specific product, keyset-paginated (JSON)"""
     try:
         product = Product.objects.get(pk=product_id)
-        transactions = StockTransaction.objects.filter(product=product).select_related('created_by').order_by('-created_at')
+        transactions = StockTransaction.objects.filter(product=product)
+        page, next_cursor = _keyset_page(request, transactions.select_related('created_by'), TRANSACTION_ORDERING)
 
         tx_list = [{
             'id': t.id,
@@ -509,9 +742,9 @@ def api_product_transaction_history(request, product_id):
             'type_display': t.get_transaction_type_display(),
             'quantity': t.quantity,
             'notes': t.notes,
-            'created_by': t.created_by.username,
+            'created_by': t.created_by.username if t.created_by_id else None,
             'created_at': t.created_at.isoformat()
-        } for t in transactions]
+        } for t in page]
 
         stats = transactions.aggregate(
             total_transactions=Count('id'),
@@ -522,26 +755,81 @@ def api_product_transaction_history(request, product_id):
         return JsonResponse({
             'product': {'id': product.id, 'sku': product.sku, 'name': product.name, 'current_stock': product.stock_quantity},
             'stats': {'total_transactions': stats['total_transactions'], 'total_in': stats['total_in'] or 0, 'total_out': stats['total_out'] or 0},
-            'transactions': tx_list
+            'transactions': tx_list,
+            'next_cursor': next_cursor,
         }, safe=False)
     except Product.DoesNotExist:
         return JsonResponse({'error': 'Product not found'}, status=404)
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+
+@query_budget(4)
+def api_stock_as_of(request):
+    """
+    Stok & nilai stok per produk pada akhir tanggal lokal ?date= (default hari ini), keyset-paginated (JSON).
+    Dihitung dari checkpoint terdekat ditambah delta rekap harian (core/checkpoints.py).
+    """
+    from django.utils import timezone
+
+    today = timezone.localdate()
+    try:
+        day = date.fromisoformat(request.GET['date']) if request.GET.get('date') else today
+    except ValueError:
+        return JsonResponse({'error': 'date must be YYYY-MM-DD'}, status=400)
+    if day > today:
+        return JsonResponse({'error': 'date must not be in the future'}, status=400)
+
+    products, checkpoint = stock_as_of(day)
+    try:
+        page, next_cursor = _keyset_page(request, products.only('id', 'sku', 'name'), PRODUCT_ORDERING)
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    totals = products.aggregate(stock_units=Sum('stock_as_of'), stock_value=Sum('stock_value_as_of'))
+
+    return JsonResponse({
+        'date': day.isoformat(),
+        'checkpoint': checkpoint.isoformat() if checkpoint else None,
+        'totals': {'stock_units': totals['stock_units'] or 0, 'stock_value': float(totals['stock_value'] or 0)},
+        'products': [{'id': p.id, 'sku': p.sku, 'name': p.name, 'stock_quantity': p.stock_as_of,
+                      'stock_value': float(p.stock_value_as_of)} for p in page],
+        'next_cursor': next_cursor,
+    }, safe=False)
 
 
 # ============= SEARCH & FILTER (API) =============
 
+@query_budget(1)
 def api_search_products(request):
-    """Search products by name or SKU (JSON)"""
+    """Search products by name or SKU, ranked by similarity and limited by ?limit= (JSON)"""
     query = request.GET.get('q', '')
     if not query:
         return JsonResponse({'error': 'No search query provided'}, status=400)
 
-    products = Product.objects.filter(Q(name__icontains=query) | Q(sku__icontains=query)).select_related('category', 'supplier')
+    try:
+        limit = parse_limit(request.GET.get('limit'), default=SEARCH_LIMIT, maximum=MAX_SEARCH_LIMIT)
+    except InvalidCursor as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    products = search_products(Product.objects.select_related('category', 'supplier'), query, limit=limit)
     data = [{'id': p.id, 'sku': p.sku, 'name': p.name, 'category': p.category.name, 'supplier': p.supplier.name,
              'stock_quantity': p.stock_quantity, 'selling_price': float(p.selling_price)} for p in products]
     return JsonResponse({'query': query, 'result_count': len(data), 'products': data}, safe=False)
 
 
+# ============= METRICS =============
+
+@query_budget(1)
+def metrics(request):
+    """Metrik runtime & gauge bisnis dalam format teks Prometheus (lihat core/metrics.py)"""
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    if not metrics_allowed(request):
+        raise PermissionDenied
+    body, content_type = render_metrics()
+    return HttpResponse(body, content_type=content_type)
+
+
 # ============= TESTING =============
 
 def testing(request):
@@ -555,72 +843,69 @@ def testing(request):
     return JsonResponse({'status': 'ok', 'counts': counts})
 
 
-def dashboard_stats_html(request):
-    """Dashboard statistik lengkap (HTML)"""
+@query_budget(8)
+async def dashboard_stats_html(request):
+    """Dashboard statistik lengkap (HTML); query independen dijalankan bersamaan"""
     from django.utils import timezone
     from datetime import timedelta
 
-    total_products = Product.objects.count()
-    total_categories = Category.objects.count()
-    total_suppliers = Supplier.objects.count()
-
-    total_stock_value = Product.objects.aggregate(total=Sum(F('stock_quantity') * F('purchase_price')))['total'] or 0
-    low_stock_products = Product.objects.filter(stock_quantity__lte=F('minimum_stock'))
-    low_stock_count = low_stock_products.count()
-    total_transactions = StockTransaction.objects.count()
-
-    top_stock_products = Product.objects.select_related('category', 'supplier').order_by('-stock_quantity')[:5]
-
-    products_with_value = Product.objects.select_related('category', 'supplier')
-    top_value_products = []
-    products_with_margin = []
-    for p in products_with_value:
-        p.stock_value = _stock_value(p)
-        top_value_products.append(p)
-        margin = _profit_margin(p.purchase_price, p.selling_price)
-        if margin:
-            p.profit_margin = margin
-            products_with_margin.append(p)
-
-    top_value_products = sorted(top_value_products, key=lambda x: x.stock_value, reverse=True)[:5]
-    top_margin_products = sorted(products_with_margin, key=lambda x: x.profit_margin, reverse=True)[:5]
-
-    category_stats = Category.objects.annotate(
-        product_count=Count('products'),
-        total_stock=Sum('products__stock_quantity'),
-        total_value=Sum(F('products__stock_quantity') * F('products__purchase_price'))
-    ).order_by('-total_value')
-
-    supplier_stats = Supplier.objects.annotate(
-        product_count=Count('products'),
-        total_stock=Sum('products__stock_quantity'),
-        total_value=Sum(F('products__stock_quantity') * F('products__purchase_price'))
-    ).order_by('-total_value')
-
-    transaction_stats = StockTransaction.objects.aggregate(
-        total_in=Sum('quantity', filter=Q(transaction_type='IN')),
-        total_out=Sum('quantity', filter=Q(transaction_type='OUT')),
+    today = timezone.localdate()
+    last_7_days = [today - timedelta(days=i) for i in range(6, -1, -1)]
+    top_fields = ('id', 'sku', 'name', 'stock_quantity', 'purchase_price', 'selling_price')
+
+    results = await gather_queries(
+        # Semua metrik produk dalam satu aggregate
+        product_stats=lambda: Product.objects.aggregate(
+            total_products=Count('id'),
+            total_stock_value=Sum(STOCK_VALUE),
+            low_stock_count=Count('id', filter=Q(is_low_stock=True)),
+            avg_purchase=Avg('purchase_price'),
+            avg_selling=Avg('selling_price'),
+            min_price=Min('selling_price'),
+            max_price=Max('selling_price'),
+        ),
+        transaction_stats=lambda: _movement_totals(DailyStockSummary.objects.all()),
+        # Ranking top-N dihitung di database (ORDER BY ... LIMIT 5)
+        top_stock_products=lambda: list(Product.objects.only(*top_fields).order_by('-stock_quantity')[:5]),
+        top_value_products=lambda: list(_with_stock_value(Product.objects.only(*top_fields)).order_by('-stock_value', 'id')[:5]),
+        top_margin_products=lambda: list(_with_profit_margin(Product.objects.only(*top_fields))
+                                         .filter(purchase_price__gt=0).exclude(selling_price=F('purchase_price'))
+                                         .order_by('-profit_margin', 'id')[:5]),
+        # Agregat per kategori/supplier dari cache; jumlahnya sekaligus memberi total kategori/supplier
+        category_stats=category_valuation,
+        supplier_stats=supplier_valuation,
+        # Satu query ke rekap harian (indexed by date) untuk 7 hari terakhir
+        daily=lambda: {row['date']: row for row in (DailyStockSummary.objects
+                       .filter(date__gte=last_7_days[0], date__lte=today)
+                       .values('date')
+                       .annotate(stock_in=Sum('quantity', filter=Q(transaction_type='IN')),
+                                 stock_out=Sum('quantity', filter=Q(transaction_type='OUT')),
+                                 count=Sum('transaction_count'))
+                       .order_by())},
     )
-
+    product_stats = results['product_stats']
+    total_products = product_stats['total_products']
+    total_stock_value = product_stats['total_stock_value'] or 0
+    low_stock_count = product_stats['low_stock_count']
+    low_stock_products = Product.objects.filter(is_low_stock=True)
+    transaction_stats = results['transaction_stats']
+    total_transactions = transaction_stats['total_transactions']
+    top_stock_products = results['top_stock_products']
+    top_value_products = results['top_value_products']
+    top_margin_products = results['top_margin_products']
+    category_stats = results['category_stats']
+    supplier_stats = results['supplier_stats']
+    total_categories = len(category_stats)
+    total_suppliers = len(supplier_stats)
     recent_transactions = StockTransaction.objects.select_related('product', 'created_by').order_by('-created_at')[:10]
 
-    today = timezone.now().date()
-    last_7_days = [today - timedelta(days=i) for i in range(6, -1, -1)]
+    daily = results['daily']
     daily_transactions = []
     for day in last_7_days:
-        agg = StockTransaction.objects.filter(created_at__date=day).aggregate(
-            stock_in=Sum('quantity', filter=Q(transaction_type='IN')),
-            stock_out=Sum('quantity', filter=Q(transaction_type='OUT')),
-            count=Count('id')
-        )
-        daily_transactions.append({'date': day, 'stock_in': agg['stock_in'] or 0, 'stock_out': agg['stock_out'] or 0, 'count': agg['count']})
+        agg = daily.get(day, {})
+        daily_transactions.append({'date': day, 'stock_in': agg.get('stock_in') or 0, 'stock_out': agg.get('stock_out') or 0, 'count': agg.get('count') or 0})
 
-    price_stats = Product.objects.aggregate(
-        avg_purchase=Avg('purchase_price'),
-        avg_selling=Avg('selling_price'),
-        min_price=Min('selling_price'),
-        max_price=Max('selling_price'),
-    )
+    price_stats = {k: product_stats[k] for k in ('avg_purchase', 'avg_selling', 'min_price', 'max_price')}
 
     context = {
         'total_products': total_products,
@@ -640,4 +925,5 @@ def dashboard_stats_html(request):
         'daily_transactions': daily_transactions,
         'price_stats': price_stats,
     }
-    return render(request, 'inventory/dashboard_stats.html', context)
\ No newline at end of file
+    # Render di thread sync: context processor (request.user) masih bisa mengakses DB
+    return await sync_to_async(render)(request, 'inventory/dashboard_stats.html', context)
\ No newline at end of file
@@ -0,0 +1,68 @@
+# gunicorn.conf.py
+"""
+Profil production: `gunicorn simplelms.wsgi` (file ini dibaca otomatis dari direktori kerja).
+
+Worker gthread: setiap thread memegang koneksi PostgreSQL persistent (DB_CONN_MAX_AGE)
+yang dicek dulu sebelum dipakai ulang (CONN_HEALTH_CHECKS), sehingga request tidak
+membayar biaya connect. Satu worker memakai hingga GUNICORN_THREADS + STATS_QUERY_WORKERS
+koneksi, jadi jumlah worker default = jumlah core, dibatasi DB_CONNECTION_BUDGET (default 60,
+di bawah max_connections=100 PostgreSQL agar tersisa untuk migrate, admin dan cron).
+Budget adalah total untuk instance ini; bagi antar instance, atau pakai pgbouncer.
+
+Bandingkan throughput dengan dev server (dataset sama, DEBUG=False):
+
+    python manage.py runserver 0.0.0.0:8000 --noreload
+    gunicorn simplelms.wsgi --bind 0.0.0.0:8000
+    python manage.py benchmark_throughput http://localhost:8000/api/products/ --concurrency 16
+
+Hasil pengukuran mentah: benchmarks/results/throughput-{runserver,gunicorn}.json, diukur
+dengan perintah di atas (`--concurrency 16 --duration 15 --output ...`) pada 1 vCPU dengan
+PostgreSQL lokal di host yang sama, dataset `generate_inventory --products 10000
+--transactions 100000 --seed 0`, DEBUG=False, gunicorn default (1 worker x 4 thread):
+
+    URL               runserver                         gunicorn
+    /api/products/    57.6 req/s, p95  344 ms, 0 err    114.3 req/s, p95 181 ms, 0 err
+    /dashboard/       19.2 req/s, p95 1006 ms, 0 err     18.5 req/s, p95 998 ms, 0 err
+
+Endpoint ringan naik ~2x (koneksi persistent, tanpa overhead dev server); dashboard
+yang CPU-bound tidak bertambah cepat di 1 core.
+"""
+import multiprocessing
+import os
+import shutil
+
+# Alias: gunicorn membaca setiap nama level modul sebagai setting, dan `config` adalah salah satunya
+from decouple import config as env
+
+bind = env('GUNICORN_BIND', default='0.0.0.0:8000')
+worker_class = 'gthread'
+threads = env('GUNICORN_THREADS', default=4, cast=int)
+# Koneksi DB per worker: thread request + thread query statistik (core/concurrency.py)
+_connections_per_worker = threads + env('STATS_QUERY_WORKERS', default=4, cast=int)
+_connection_budget = env('DB_CONNECTION_BUDGET', default=60, cast=int)
+workers = env('GUNICORN_WORKERS', cast=int,
+              default=max(1, min(multiprocessing.cpu_count(), _connection_budget // _connections_per_worker)))
+timeout = env('GUNICORN_TIMEOUT', default=60, cast=int)
+graceful_timeout = 30
+keepalive = 5
+# Daur ulang worker berkala agar kebocoran memori tidak menumpuk; jitter supaya tidak restart bersamaan
+max_requests = env('GUNICORN_MAX_REQUESTS', default=2000, cast=int)
+max_requests_jitter = max_requests // 10
+
+accesslog = env('GUNICORN_ACCESS_LOG', default='-')
+errorlog = '-'
+
+# Metrik multiprocess (core/metrics.py): file mmap worker lama dihapus saat start
+prometheus_multiproc_dir = env('PROMETHEUS_MULTIPROC_DIR', default='')
+
+
+def on_starting(server):
+    if prometheus_multiproc_dir:
+        shutil.rmtree(prometheus_multiproc_dir, ignore_errors=True)
+        os.makedirs(prometheus_multiproc_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if prometheus_multiproc_dir:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
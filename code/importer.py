@@ -1,7 +1,6 @@
 # code/importer.py
 import os
 import sys
-import csv
 from decimal import Decimal
 from random import randint, choice
 
@@ -14,7 +13,9 @@ import django
 django.setup()
 
 from django.contrib.auth.models import User
-from core.models import Category, Supplier, Product, StockTransaction
+from core.models import Category, Supplier, Product
+from core.services import record_stock_movement
+from core.importing import ensure_categories, ensure_suppliers, read_csv, upsert_products
 
 print("🚀 Starting import process...")
 
@@ -32,10 +33,7 @@ else:
 # 2) Import Categories from CSV
 categories_file = os.path.join(BASE_DIR, 'csv_data', 'categories.csv')
 if os.path.exists(categories_file):
-    with open(categories_file, newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            Category.objects.get_or_create(name=row['name'].strip())
+    ensure_categories(row['name'] for row in read_csv(categories_file))
     print("✅ Categories imported from CSV")
 else:
     # Fallback to default data
@@ -56,16 +54,7 @@ else:
 # 3) Import Suppliers from CSV
 suppliers_file = os.path.join(BASE_DIR, 'csv_data', 'suppliers.csv')
 if os.path.exists(suppliers_file):
-    with open(suppliers_file, newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            Supplier.objects.get_or_create(
-                name=row['name'].strip(),
-                defaults={
-                    'phone': row.get('phone', ''),
-                    'address': row.get('address', ''),
-                }
-            )
+    ensure_suppliers(read_csv(suppliers_file))
     print("✅ Suppliers imported from CSV")
 else:
     # Fallback to default data
@@ -89,24 +78,7 @@ else:
 # 4) Import Products from CSV
 products_file = os.path.join(BASE_DIR, 'csv_data', 'products.csv')
 if os.path.exists(products_file):
-    with open(products_file, newline='', encoding='utf-8') as csvfile:
-        reader = csv.DictReader(csvfile)
-        for row in reader:
-            category, _ = Category.objects.get_or_create(name=row['category'])
-            supplier, _ = Supplier.objects.get_or_create(name=row['supplier'])
-            
-            Product.objects.update_or_create(
-                sku=row['sku'],
-                defaults={
-                    'name': row['name'],
-                    'category': category,
-                    'supplier': supplier,
-                    'purchase_price': Decimal(row['purchase_price']),
-                    'selling_price': Decimal(row['selling_price']),
-                    'stock_quantity': int(row['stock_quantity']),
-                    'minimum_stock': int(row['minimum_stock']),
-                }
-            )
+    upsert_products(read_csv(products_file))
     print("✅ Products imported from CSV")
 else:
     # Fallback to default data
@@ -152,27 +124,17 @@ if products:
     transaction_count = 0
     for i in range(30):
         product = choice(products)
-        trans_type = choice(['IN', 'OUT'])
+        # Stok keluar tidak boleh melebihi stok (InsufficientStock)
+        trans_type = choice(['IN', 'OUT']) if product.stock_quantity > 0 else 'IN'
         
         if trans_type == 'IN':
             qty = randint(5, 20)
         else:
-            qty = randint(1, min(10, max(1, product.stock_quantity)))
+            qty = randint(1, min(10, product.stock_quantity))
         
-        StockTransaction.objects.create(
-            product=product,
-            transaction_type=trans_type,
-            quantity=qty,
-            notes=f"Sample transaction {i+1}",
-            created_by=admin_user
-        )
-        
-        # Update stock
-        if trans_type == 'IN':
-            product.stock_quantity += qty
-        else:
-            product.stock_quantity = max(0, product.stock_quantity - qty)
-        product.save()
+        # Transaksi + update stok atomik
+        record_stock_movement(product, trans_type, qty, admin_user, notes=f"Sample transaction {i+1}")
+        product.stock_quantity += qty if trans_type == 'IN' else -qty
         transaction_count += 1
     
     print(f"✅ {transaction_count} sample transactions created")
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 from decouple import config, Csv
 
@@ -17,14 +18,16 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
-    'silk',
     'widget_tweaks',
     
     'core',
 ]
 
 MIDDLEWARE = [
+    'core.profiling.SlowRequestMiddleware',
+    'core.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -33,7 +36,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'silk.middleware.SilkyMiddleware',
+    # Harus paling akhir: hanya query view yang dihitung (lihat core/budgets.py)
+    'core.budgets.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'simplelms.urls'
@@ -55,7 +59,6 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'simplelms.wsgi.application'
-SILKY_PYTHON_PROFILER = True
 # Database
 
 DATABASES = {
@@ -66,9 +69,94 @@ DATABASES = {
         'PASSWORD': config('DATABASE_PASSWORD', default='simple_password'),
         'HOST': config('DATABASE_HOST', default='postgres'), 
         'PORT': config('DB_PORT', default='5432'),
+        # Koneksi persistent per thread (detik; 0 = tutup setiap request), dicek sebelum dipakai ulang
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        # Wajib True di belakang pgbouncer mode transaction (.iterator() memakai server-side cursor)
+        'DISABLE_SERVER_SIDE_CURSORS': config('DB_DISABLE_SERVER_SIDE_CURSORS', default=False, cast=bool),
     }
 }
 
+# Tidak ada pool di dalam proses (Django 5.0 + psycopg2). Jumlah koneksi dibatasi lewat
+# ukuran worker gunicorn (DB_CONNECTION_BUDGET, lihat gunicorn.conf.py); untuk banyak
+# instance, arahkan DATABASE_HOST/DB_PORT ke pgbouncer (pool_mode=transaction) dengan
+# DB_CONN_MAX_AGE=0 dan DB_DISABLE_SERVER_SIDE_CURSORS=True.
+
+# Profiling (core/profiling.py): off, sampled (1 dari PROFILING_SAMPLE_RATE request), atau full.
+# Sebelum mengaktifkan sampled/full, buat tabel silk di database profiling:
+#   python manage.py migrate --database=profiling
+# Untuk beberapa worker gunicorn gunakan PostgreSQL (PROFILING_DB_ENGINE/PROFILING_DB_NAME), bukan SQLite.
+# Kegagalan menulis data profiling tidak pernah menggagalkan request (core/profiling_silk.py).
+PROFILING_MODE = config('PROFILING_MODE', default='off')
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=100, cast=int)
+# Request di atas ambang ini selalu dicatat (JSON per baris) ke PROFILING_SLOW_LOG
+PROFILING_SLOW_MS = config('PROFILING_SLOW_MS', default=500, cast=int)
+PROFILING_SLOW_LOG = config('PROFILING_SLOW_LOG', default=str(BASE_DIR / 'slow_requests.log'))
+
+if PROFILING_MODE != 'off':
+    INSTALLED_APPS.insert(INSTALLED_APPS.index('widget_tweaks'), 'silk')
+    MIDDLEWARE.insert(MIDDLEWARE.index('core.budgets.QueryBudgetMiddleware'), 'core.profiling_silk.SafeSilkyMiddleware')
+    SILKY_PYTHON_PROFILER = True
+    if PROFILING_MODE == 'sampled':
+        from core.profiling import should_profile
+        SILKY_INTERCEPT_FUNC = should_profile
+    # Data silk di database terpisah: python manage.py migrate --database=profiling
+    DATABASES['profiling'] = {
+        **DATABASES['default'],
+        'ENGINE': config('PROFILING_DB_ENGINE', default='django.db.backends.sqlite3'),
+        'NAME': config('PROFILING_DB_NAME', default=str(BASE_DIR / 'profiling.sqlite3')),
+    }
+    DATABASE_ROUTERS = ['core.profiling.ProfilingRouter']
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'slow': {'format': '%(asctime)s %(message)s'},
+    },
+    'handlers': {
+        'slow_requests': {
+            'class': 'logging.handlers.WatchedFileHandler',
+            'filename': PROFILING_SLOW_LOG,
+            'formatter': 'slow',
+            'delay': True,
+        },
+    },
+    'loggers': {
+        'core.profiling.slow': {'handlers': ['slow_requests'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
+# Cache (agregat valuasi stok, lihat core/cache.py).
+# Default FileBasedCache agar versi valuasi dibagi semua proses: worker gunicorn dan
+# management command (import_inventory, generate_inventory) yang menaikkan versi setelah commit.
+# LocMemCache per proses hanya aman untuk satu proses, mis. CACHE_BACKEND=...locmem.LocMemCache.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': config('CACHE_LOCATION', default=os.path.join(tempfile.gettempdir(), 'inventory-cache')),
+    }
+}
+
+# Jumlah thread untuk query statistik yang dijalankan bersamaan (core/concurrency.py)
+STATS_QUERY_WORKERS = config('STATS_QUERY_WORKERS', default=4, cast=int)
+
+# Budget query per view (core/budgets.py): off, log, atau raise
+QUERY_BUDGET_MODE = config('QUERY_BUDGET_MODE', default='log')
+
+# Metrik Prometheus di /metrics (core/metrics.py)
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+# Hanya untuk scraper: alamat/CIDR REMOTE_ADDR yang diizinkan (X-Forwarded-For tidak dipercaya,
+# jadi di belakang reverse proxy blokir /metrics di proxy atau pakai token), dan/atau
+# token untuk header `Authorization: Bearer <token>` (bearer_token di scrape config Prometheus)
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='127.0.0.1,::1', cast=Csv())
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+# Untuk beberapa worker gunicorn: direktori bersama yang dikosongkan setiap start,
+# mis. PROMETHEUS_MULTIPROC_DIR=/tmp/inventory-metrics. Harus di-set sebelum prometheus_client diimport.
+PROMETHEUS_MULTIPROC_DIR = config('PROMETHEUS_MULTIPROC_DIR', default='')
+if PROMETHEUS_MULTIPROC_DIR:
+    os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', PROMETHEUS_MULTIPROC_DIR)
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -104,7 +192,9 @@ LOGIN_REDIRECT_URL = '/'
 
 # Security settings for production
 if not DEBUG:
-    SECURE_SSL_REDIRECT = True
+    # TLS di-terminate oleh reverse proxy di depan gunicorn
+    SECURE_SSL_REDIRECT = config('SECURE_SSL_REDIRECT', default=True, cast=bool)
+    SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
     SESSION_COOKIE_SECURE = True
     CSRF_COOKIE_SECURE = True
     SECURE_BROWSER_XSS_FILTER = True
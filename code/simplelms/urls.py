@@ -7,13 +7,14 @@ urlpatterns = [
     # Admin Panel
     path('admin/', admin.site.urls),
     
-    # Silk Profiler
-    path('silk/', include('silk.urls', namespace='silk')),
-    
     # Main App
     path('', include('core.urls')),
 ]
 
+# Silk Profiler (PROFILING_MODE sampled/full)
+if 'silk' in settings.INSTALLED_APPS:
+    urlpatterns.insert(1, path('silk/', include('silk.urls', namespace='silk')))
+
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)